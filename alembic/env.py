@@ -43,7 +43,8 @@ db_url = app_config.SQLALCHEMY_DATABASE_URI
 if not db_url:
     print("Erro: SQLALCHEMY_DATABASE_URI não está configurado na aplicação.")
     sys.exit(1)
-config.set_main_option('sqlalchemy.url', db_url)
+# URL -> string com a senha; '%' precisa ser escapado para o configparser do Alembic
+config.set_main_option('sqlalchemy.url', db_url.render_as_string(hide_password=False).replace('%', '%%'))
 # ---------------------------------------------
 
 # Interpreta o arquivo de configuração para logging do Python.
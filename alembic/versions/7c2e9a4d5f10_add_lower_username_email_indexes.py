@@ -0,0 +1,32 @@
+"""Add case-insensitive lookup indexes on users.username and users.email
+
+Revision ID: 7c2e9a4d5f10
+Revises: 1b03d6b18412
+Create Date: 2026-10-17 10:12:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c2e9a4d5f10'
+down_revision: Union[str, None] = '1b03d6b18412'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # find_by_username filtra por lower(username): sem índice de expressão vira seq scan.
+    # Índices só de busca (não únicos): não falham em bases que já têm 'Bob'/'bob'.
+    # ix_user_permissions_user_id (unique) já existe desde a revisão inicial.
+    op.create_index('ix_users_username_lower', 'users', [sa.text('lower(username)')], unique=False)
+    op.create_index('ix_users_email_lower', 'users', [sa.text('lower(email)')], unique=False,
+                    postgresql_where=sa.text('email IS NOT NULL'))
+
+
+def downgrade() -> None:
+    op.drop_index('ix_users_email_lower', table_name='users')
+    op.drop_index('ix_users_username_lower', table_name='users')
@@ -1,41 +1,62 @@
 # src/api/__init__.py
 # Initializes the API layer and registers blueprints.
 
-from flask import Flask
-from .routes.auth import auth_bp
-from .routes.users import users_bp
-from .routes.products import products_bp
-from .routes.fabrics import fabrics_bp
-from .routes.observations import observations_bp
-from .routes.customer_panel import customer_panel_bp
-from .routes.fiscal import fiscal_bp
-from .routes.accounts_receivable import accounts_receivable_bp # <<<--- ADDED
+import importlib
+from typing import Iterable, Optional
+from flask import Flask, Blueprint
 from src.utils.logger import logger
 
-# List of blueprints to register
-# Add new blueprints here as they are created
+# List of blueprints to register, as "module:attribute" paths.
+# Add new blueprints here as they are created. Route modules are only imported
+# by register_blueprints(), so importing src.api (e.g. for decorators/errors)
+# doesn't pull in every route module and its services.
 BLUEPRINTS = [
-    (auth_bp, '/api/auth'),
-    (users_bp, '/api/users'),
-    (products_bp, '/api/products'),
-    (fabrics_bp, '/api/fabrics'),
-    (observations_bp, '/api/observations'),
-    (customer_panel_bp, '/api/customer_panel'),
-    (fiscal_bp, '/api/fiscal'),
-    (accounts_receivable_bp, '/api/accounts-receivable'), # <<<--- ADDED
+    ('src.api.routes.auth:auth_bp', '/api/auth'),
+    ('src.api.routes.users:users_bp', '/api/users'),
+    ('src.api.routes.products:products_bp', '/api/products'),
+    ('src.api.routes.fabrics:fabrics_bp', '/api/fabrics'),
+    ('src.api.routes.observations:observations_bp', '/api/observations'),
+    ('src.api.routes.customer_panel:customer_panel_bp', '/api/customer_panel'),
+    ('src.api.routes.fiscal:fiscal_bp', '/api/fiscal'),
+    ('src.api.routes.accounts_receivable:accounts_receivable_bp', '/api/accounts-receivable'),
 ]
 
-def register_blueprints(app: Flask):
+def _load_blueprint(path: str) -> Blueprint:
+    """Imports and returns the blueprint referenced by a 'module:attribute' path."""
+    module_name, _, attribute = path.partition(':')
+    return getattr(importlib.import_module(module_name), attribute)
+
+def _selected_blueprints(only: Optional[Iterable[str]] = None):
+    """Yields the (path, prefix) entries of BLUEPRINTS selected by 'only' (URL prefixes)."""
+    selected = set(only) if only is not None else None
+    for path, prefix in BLUEPRINTS:
+        if selected is None or prefix in selected:
+            yield path, prefix
+
+def preload_blueprints(only: Optional[Iterable[str]] = None) -> None:
+    """
+    Imports the route modules that register_blueprints() will need, without touching
+    the app. create_app runs this in a worker thread so the imports overlap with the
+    database connection/schema setup.
+    """
+    for path, _ in _selected_blueprints(only):
+        _load_blueprint(path)
+
+def register_blueprints(app: Flask, only: Optional[Iterable[str]] = None):
     """
-    Registers all defined blueprints with the Flask application.
+    Registers the defined blueprints with the Flask application.
 
     Args:
         app: The Flask application instance.
+        only: Optional URL prefixes to register (e.g. ['/api/auth', '/api/users']).
+              Route modules of blueprints that are left out are never imported,
+              which keeps create_app() cheap for tests that exercise a single area.
     """
     logger.info("Registering API blueprints...")
-    for bp, prefix in BLUEPRINTS:
+    for path, prefix in _selected_blueprints(only):
+        bp = _load_blueprint(path)
         app.register_blueprint(bp, url_prefix=prefix)
         logger.debug(f"Blueprint '{bp.name}' registered with prefix '{prefix}'.")
     logger.info("All API blueprints registered.")
 
-__all__ = ["register_blueprints"]
\ No newline at end of file
+__all__ = ["register_blueprints", "preload_blueprints"]
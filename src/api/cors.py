@@ -0,0 +1,41 @@
+# src/api/cors.py
+# Minimal CORS handling for the API (replaces Flask-CORS).
+
+from flask import Flask, request, Response
+
+_API_PREFIX = '/api/'
+_ALLOWED_METHODS = 'GET, HEAD, POST, OPTIONS, PUT, PATCH, DELETE'
+_PREFLIGHT_MAX_AGE = '600'
+
+
+def _add_cors_headers(response: Response) -> Response:
+    """after_request hook: adds CORS headers to responses under /api/."""
+    if not request.path.startswith(_API_PREFIX):
+        return response
+    origin = request.headers.get('Origin')
+    if not origin:
+        return response # Requisição não-CORS (mesma origem, curl, etc.)
+
+    headers = response.headers
+    # Qualquer origem é aceita, mas com credenciais o navegador exige a origem
+    # explícita (não '*'): a origem da requisição é refletida, como no Flask-CORS.
+    headers['Access-Control-Allow-Origin'] = origin
+    headers['Access-Control-Allow-Credentials'] = 'true'
+    headers.add('Vary', 'Origin')
+
+    if request.method == 'OPTIONS' and 'Access-Control-Request-Method' in request.headers:
+        # Preflight: a resposta automática de OPTIONS do Flask recebe os headers aqui
+        headers['Access-Control-Allow-Methods'] = _ALLOWED_METHODS
+        requested_headers = request.headers.get('Access-Control-Request-Headers')
+        if requested_headers:
+            headers['Access-Control-Allow-Headers'] = requested_headers
+        headers['Access-Control-Max-Age'] = _PREFLIGHT_MAX_AGE
+    return response
+
+
+def register_cors(app: Flask) -> None:
+    """
+    Allows cross-origin requests (any origin, with credentials) on /api/* routes.
+    Preflight requests are answered by Flask's automatic OPTIONS handling.
+    """
+    app.after_request(_add_cors_headers)
@@ -9,9 +9,9 @@ from src.utils.logger import logger
 
 # Helper to get auth_service instance from app context
 def _get_auth_service() -> AuthService:
-        service = current_app.config.get('auth_service')
+        service = current_app.extensions['services'].get('auth_service')
         if not service:
-            logger.critical("AuthService not found in application config!")
+            logger.critical("AuthService not found in application service registry!")
             # Raising allows Flask's error handlers to catch it
             raise ApiError("Authentication service is unavailable.", 503)
         return service
@@ -53,7 +53,8 @@ def login_required(f):
 def admin_required(f):
     """
     Decorator to ensure the user is logged in AND is an administrator.
-    Must be used *after* @login_required.
+    Runs @login_required first, so request.current_user is always a User
+    loaded (and checked for is_active) on this request.
     """
     @wraps(f)
     @login_required # Ensures login_required runs first and sets request.current_user
@@ -80,36 +80,44 @@ class ConfigurationError(ApiError):
 
 # --- Flask Error Handlers ---
 
+# Handlers definidos uma vez no import do módulo (não recriados como closures a
+# cada create_app); register_error_handlers apenas os associa à app.
+
+def handle_api_error(error):
+    """Handler for custom ApiError exceptions."""
+    logger.warning(f"API Error Handled: {type(error).__name__} - Status: {error.status_code} - Msg: {error.message}")
+    response = jsonify(error.to_dict())
+    response.status_code = error.status_code
+    return response
+
+def handle_http_exception(error):
+    """Handler for standard werkzeug HTTPExceptions (like 404, 405)."""
+    # Log werkzeug's default exceptions
+    # Now 'request' is available
+    logger.warning(f"HTTP Exception Handled: {error.code} {error.name} - Path: {request.path} - Msg: {error.description}")
+    response = jsonify({"error": f"{error.name}: {error.description}"})
+    response.status_code = error.code
+    # CORS headers are added by the after_request hook (src/api/cors.py) even for errors
+    return response
+
+def handle_generic_exception(error):
+    """Handler for any other unhandled exceptions."""
+    # Log the full traceback for unexpected errors
+    logger.error(f"Unhandled Exception: {error}", exc_info=True)
+    # Return a generic 500 error to the client
+    response = jsonify({"error": "An unexpected internal server error occurred."})
+    response.status_code = 500
+    return response
+
+_ERROR_HANDLERS = (
+    (ApiError, handle_api_error),
+    (HTTPException, handle_http_exception),
+    (Exception, handle_generic_exception),
+)
+
 def register_error_handlers(app):
     """Registers custom error handlers with the Flask app."""
+    for exc_class, handler in _ERROR_HANDLERS:
+        app.register_error_handler(exc_class, handler)
 
-    @app.errorhandler(ApiError)
-    def handle_api_error(error):
-        """Handler for custom ApiError exceptions."""
-        logger.warning(f"API Error Handled: {type(error).__name__} - Status: {error.status_code} - Msg: {error.message}")
-        response = jsonify(error.to_dict())
-        response.status_code = error.status_code
-        return response
-
-    @app.errorhandler(HTTPException)
-    def handle_http_exception(error):
-        """Handler for standard werkzeug HTTPExceptions (like 404, 405)."""
-        # Log werkzeug's default exceptions
-        # Now 'request' is available
-        logger.warning(f"HTTP Exception Handled: {error.code} {error.name} - Path: {request.path} - Msg: {error.description}")
-        response = jsonify({"error": f"{error.name}: {error.description}"})
-        response.status_code = error.code
-        # CORS headers should be handled by Flask-CORS middleware even for errors
-        return response
-
-    @app.errorhandler(Exception)
-    def handle_generic_exception(error):
-        """Handler for any other unhandled exceptions."""
-        # Log the full traceback for unexpected errors
-        logger.error(f"Unhandled Exception: {error}", exc_info=True)
-        # Return a generic 500 error to the client
-        response = jsonify({"error": "An unexpected internal server error occurred."})
-        response.status_code = 500
-        return response
-
-    logger.info("Custom error handlers registered.")
\ No newline at end of file
+    logger.info("Custom error handlers registered.")
@@ -12,9 +12,9 @@ accounts_receivable_bp = Blueprint('accounts_receivable', __name__)
 
 # Helper to get Service instance
 def _get_ar_service() -> AccountsReceivableService:
-    service = current_app.config.get('accounts_receivable_service')
+    service = current_app.extensions['services'].get('accounts_receivable_service')
     if not service:
-        logger.critical("AccountsReceivableService not found in application config!")
+        logger.critical("AccountsReceivableService not found in application service registry!")
         raise ServiceError("Accounts Receivable service is unavailable.", 503)
     return service
 
@@ -11,9 +11,9 @@ auth_bp = Blueprint('auth', __name__)
 
 # Helper to get auth_service instance from app context
 def _get_auth_service() -> AuthService:
-     service = current_app.config.get('auth_service')
+     service = current_app.extensions['services'].get('auth_service')
      if not service:
-          logger.critical("AuthService not found in application config!")
+          logger.critical("AuthService not found in application service registry!")
           raise ApiError("Authentication service is unavailable.", 503)
      return service
 
@@ -3,20 +3,19 @@
 
 from flask import Blueprint, request, jsonify, current_app
 from src.services.customer_service import CustomerService # Import the specific service
-from src.erp_integration.erp_person_service import ErpPersonService # Needed to instantiate service
-from src.erp_integration import erp_auth_service # Need auth for ERP service
 from src.api.decorators import login_required, customer_panel_access_required # Import decorators
 from src.api.errors import ApiError, NotFoundError, ValidationError # Import custom errors
 from src.utils.logger import logger
 
 customer_panel_bp = Blueprint('customer_panel', __name__)
 
-# Helper function to instantiate or get the CustomerService
-# This could be improved with a proper dependency injection framework later
+# Helper to get CustomerService (registered lazily by create_app; one shared instance)
 def _get_customer_service() -> CustomerService:
-     erp_person_svc = ErpPersonService(erp_auth_service) # Use singleton ERP auth
-     # Simple instantiation:
-     return CustomerService(erp_person_svc)
+     service = current_app.extensions['services'].get('customer_service')
+     if not service:
+          logger.critical("CustomerService not found in application service registry!")
+          raise ApiError("Customer service is unavailable.", 503)
+     return service
 
 @customer_panel_bp.route('/data', methods=['POST'])
 @login_required
@@ -11,9 +11,9 @@ from src.utils.logger import logger
 # --- Get Service Instances ---
 # Helper functions to get services from app context
 def _get_fabric_service() -> FabricService:
-    service = current_app.config.get('fabric_service')
+    service = current_app.extensions['services'].get('fabric_service')
     if not service:
-        logger.critical("FabricService not found in application config!")
+        logger.critical("FabricService not found in application service registry!")
         raise ServiceError("Fabric service is unavailable.", 503)
     return service
 
@@ -167,5 +167,5 @@ def clear_fabric_cache():
         return jsonify({"error": "An unexpected error occurred while clearing the cache."}), 500
 
 # --- Service Instantiation (Done in app factory) ---
-# You need to ensure FabricService is instantiated and added to app.config['fabric_service']
-# in src/app.py, similar to how auth_service is done.
\ No newline at end of file
+# FabricService is registered (lazily) in app.extensions['services'] by src/app.py,
+# similar to how auth_service is done.
\ No newline at end of file
@@ -14,9 +14,9 @@ fiscal_bp = Blueprint('fiscal', __name__)
 
 # Helper to get FiscalService instance
 def _get_fiscal_service() -> FiscalService:
-    service = current_app.config.get('fiscal_service')
+    service = current_app.extensions['services'].get('fiscal_service')
     if not service:
-        logger.critical("FiscalService not found in application config!")
+        logger.critical("FiscalService not found in application service registry!")
         raise ServiceError("Fiscal service is unavailable.", 503)
     return service
 
@@ -17,10 +17,10 @@ observations_bp = Blueprint('observations', __name__)
 
 # Helper para obter ObservationService
 def _get_observation_service() -> ObservationService:
-     service = current_app.config.get('observation_service')
+     service = current_app.extensions['services'].get('observation_service')
      if not service:
           # Idealmente, a injeção deve ser garantida no create_app
-          logger.critical("ObservationService not found in application config!")
+          logger.critical("ObservationService not found in application service registry!")
           raise ServiceError("Observation service is unavailable.", 503) # Usar ServiceError
      return service
 
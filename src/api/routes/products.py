@@ -9,9 +9,9 @@ from src.utils.logger import logger
 
 # --- Get Service Instances ---
 def _get_product_service() -> ProductService:
-    service = current_app.config.get('product_service')
+    service = current_app.extensions['services'].get('product_service')
     if not service:
-        logger.critical("ProductService not found in application config!")
+        logger.critical("ProductService not found in application service registry!")
         raise ServiceError("Product service is unavailable.", 503)
     return service
 
@@ -1,31 +1,59 @@
 # src/api/routes/users.py
 # Defines API endpoints for managing users (CRUD). Requires admin privileges.
 
-from flask import Blueprint, request, jsonify, current_app
-from src.domain.user import User, UserPermissions
-from src.database.user_repository import UserRepository
-from sqlalchemy.orm import Session
-from src.database import get_db_session
+import msgspec
+from flask import Blueprint, Response, request, jsonify, current_app, g, stream_with_context
+from src.domain.user import User, UserPermissions, CreateUserPayload, UpdateUserPayload, BulkDeleteUsersPayload, hash_password
+from src.database import get_db
 
 from src.api.decorators import admin_required
-from src.api.errors import ApiError, NotFoundError, ValidationError, ForbiddenError, DatabaseError
+from src.api.errors import NotFoundError, ValidationError, ForbiddenError, DatabaseError
 from src.utils.logger import logger
 
 from sqlalchemy.exc import SQLAlchemyError
 
 users_bp = Blueprint('users', __name__)
 
-# Helper para obter UserRepository (pode ser movido para um local central se repetido)
-def _get_user_repository() -> UserRepository:
-      # Tentar obter do contexto da app se injetado (boa prática)
-      repo = current_app.config.get('user_repository')
-      if repo:
-           return repo
-      else:
-           # Fallback: criar instância (menos ideal para testes, mas funciona)
-           from src.database import get_user_repository as get_repo_func
-           logger.warning("UserRepository accessed via factory function in users route.")
-           return get_repo_func()
+# Corpos de erro pré-serializados: evitam o jsonify()/json.dumps nos caminhos de
+# erro mais frequentes (requisições malformadas).
+_ERR_NOT_JSON = b'{"error":"Request must be JSON"}'
+_ERR_EMPTY_BODY = b'{"error":"Request body cannot be empty for update."}'
+
+# Campos atualizáveis via PUT (tabela users / tabela user_permissions)
+_USER_MUTABLE_FIELDS = ('name', 'email', 'is_active')
+_PERMISSION_FIELDS = (
+    'is_admin',
+    'can_access_products',
+    'can_access_fabrics',
+    'can_access_customer_panel',
+    'can_access_fiscal',
+    'can_access_accounts_receivable',
+)
+# Corpo de PUT sem nenhum campo conhecido
+_EMPTY_UPDATE = UpdateUserPayload()
+
+def _static_error(body: bytes, status: int = 400) -> Response:
+    """Builds a JSON error response from a pre-serialized body."""
+    # Um Response novo por requisição (after_request/CORS alteram os headers),
+    # mas sem nenhum trabalho de serialização JSON.
+    return Response(body, status=status, mimetype='application/json')
+
+# --- ETag do usuário ---
+# O ETag é o hash do corpo da resposta (Response.add_etag): qualquer mudança nos
+# dados (CRUD, last_login do login, escritas de outro worker/processo) gera um
+# ETag novo, sem contador de versão. make_conditional responde 304 quando o
+# If-None-Match do cliente bate. A lista (GET '') é enviada em streaming e, por
+# isso, não tem ETag: o hash exigiria montar o corpo inteiro antes dos headers.
+_user_encoder = msgspec.json.Encoder()
+
+def _stream_users(users):
+    """Yields the '{"users": [...]}' body one encoded user at a time."""
+    yield b'{"users":['
+    separator = b''
+    for user in users:
+        yield separator + _user_encoder.encode(user)
+        separator = b','
+    yield b']}'
 
 @users_bp.route('', methods=['GET'])
 @admin_required
@@ -33,13 +61,15 @@ def get_all_users():
     """Retrieves a list of all users. (Admin only)"""
     logger.info("Get all users request received.")
     try:
-        # Obter sessão e chamar repositório
-        with get_db_session() as db:
-            user_repo = _get_user_repository()
-            users = user_repo.get_all(db) # Passar a sessão 'db'
-        # Converter objetos ORM para dicts
-        users_data = [user.to_dict(include_hash=False) for user in users]
-        return jsonify({"users": users_data}), 200
+        # Sessão da requisição (aberta sob demanda, fechada no teardown)
+        db = get_db()
+        user_repo = g.user_repo # Vinculado no before_request do create_app
+        # Projeção Core -> DTOs msgspec, enviados em streaming: cada usuário é
+        # codificado e enviado conforme as linhas chegam do cursor (sem montar a lista)
+        users = user_repo.iter_for_api(db)
+        return current_app.response_class(
+            stream_with_context(_stream_users(users)), mimetype='application/json'
+        ), 200
     except (DatabaseError, SQLAlchemyError) as e:
           logger.error(f"Database error retrieving all users: {e}", exc_info=True)
           # Usar ApiError ou erro específico
@@ -55,15 +85,17 @@ def get_user_by_id(user_id: int):
     """Retrieves a specific user by their ID. (Admin only)"""
     logger.info(f"Get user by ID request received for ID: {user_id}")
     try:
-        with get_db_session() as db:
-            user_repo = _get_user_repository()
-            user = user_repo.find_by_id(db, user_id) # Passar a sessão
+        db = get_db()
+        user_repo = g.user_repo
+        user = user_repo.find_by_id(db, user_id) # Passar a sessão
         if not user:
             logger.warning(f"User with ID {user_id} not found.")
             raise NotFoundError(f"User with ID {user_id} not found.")
 
         # Converter objeto ORM para dict
-        return jsonify(user.to_dict(include_hash=False)), 200
+        response = jsonify(user.to_dict(include_hash=False))
+        response.add_etag()
+        return response.make_conditional(request)
     except NotFoundError as e:
         return jsonify({"error": str(e)}), 404
     except (DatabaseError, SQLAlchemyError) as e:
@@ -80,44 +112,44 @@ def create_user():
     """Creates a new user with specified permissions. (Admin only)"""
     logger.info("Create user request received.")
     if not request.is_json:
-        return jsonify({"error": "Request must be JSON"}), 400
+        return _static_error(_ERR_NOT_JSON)
 
-    data = request.get_json()
-
-    required = ['username', 'password', 'name']
-    missing = [field for field in required if field not in data or not data[field]]
-    if missing:
-        logger.warning(f"Create user failed: Missing required fields: {missing}")
-        return jsonify({"error": f"Missing required fields: {', '.join(missing)}"}), 400
+    try:
+        # Decodifica e valida o corpo numa passada (obrigatórios, tipos e defaults)
+        payload = msgspec.json.decode(request.get_data(cache=False), type=CreateUserPayload)
+    except msgspec.DecodeError as e: # Inclui msgspec.ValidationError
+        logger.warning(f"Create user failed: invalid payload: {e}")
+        return jsonify({"error": f"Invalid request payload: {e}"}), 400
 
     try:
         # Criar instância de UserPermissions a partir dos dados da API
         permissions = UserPermissions(
-            is_admin=data.get('is_admin', False),
-            can_access_products=data.get('can_access_products', False),
-            can_access_fabrics=data.get('can_access_fabrics', False),
-            can_access_customer_panel=data.get('can_access_customer_panel', False),
-            can_access_fiscal=data.get('can_access_fiscal', False),
-            can_access_accounts_receivable=data.get('can_access_accounts_receivable', False)
+            is_admin=payload.is_admin,
+            can_access_products=payload.can_access_products,
+            can_access_fabrics=payload.can_access_fabrics,
+            can_access_customer_panel=payload.can_access_customer_panel,
+            can_access_fiscal=payload.can_access_fiscal,
+            can_access_accounts_receivable=payload.can_access_accounts_receivable
         )
 
         # Criar instância de User e associar permissões
         user = User(
-            username=data['username'],
-            name=data['name'],
-            email=data.get('email'),
-            is_active=data.get('is_active', True),
+            username=payload.username,
+            name=payload.name,
+            email=payload.email,
+            is_active=payload.is_active,
             permissions=permissions # Associar o objeto de permissões
         )
         # Definir a senha (o método set_password está no modelo User)
-        user.set_password(data['password'])
+        user.set_password(payload.password)
         if not user.password_hash: # Verificar se o hash foi gerado
               raise ValidationError("Failed to process password.")
 
-        # Usar sessão para adicionar ao banco
-        with get_db_session() as db:
-            user_repo = _get_user_repository()
-            created_user = user_repo.add(db, user) # Passar sessão e objeto User
+        # Sessão só é aberta aqui, depois de todas as validações
+        db = get_db()
+        user_repo = g.user_repo
+        created_user = user_repo.add(db, user) # Passar sessão e objeto User
+        db.commit()
 
         logger.info(f"User '{created_user.username}' (ID: {created_user.id}) created successfully.")
         # Converter objeto ORM para dict
@@ -140,48 +172,42 @@ def update_user(user_id: int):
     """Updates an existing user's details and/or permissions. (Admin only)"""
     logger.info(f"Update user request received for ID: {user_id}")
     if not request.is_json:
-        return jsonify({"error": "Request must be JSON"}), 400
+        return _static_error(_ERR_NOT_JSON)
 
-    data = request.get_json()
-    if not data:
-          return jsonify({"error": "Request body cannot be empty for update."}), 400
+    try:
+        # Schema parcial: campos não enviados ficam como UNSET
+        payload = msgspec.json.decode(request.get_data(cache=False), type=UpdateUserPayload)
+    except msgspec.DecodeError as e: # Inclui msgspec.ValidationError
+        logger.warning(f"Update user ID {user_id} failed: invalid payload: {e}")
+        return jsonify({"error": f"Invalid request payload: {e}"}), 400
+    if payload == _EMPTY_UPDATE:
+          return _static_error(_ERR_EMPTY_BODY)
 
     try:
-        with get_db_session() as db:
-            user_repo = _get_user_repository()
-            # Buscar o usuário existente na sessão atual
-            user = user_repo.find_by_id(db, user_id)
-            if not user:
+        # Montar somente os campos enviados (sem carregar o usuário antes)
+        user_fields = {field: value for field in _USER_MUTABLE_FIELDS
+                       if (value := getattr(payload, field)) is not msgspec.UNSET}
+        perm_fields = {field: value for field in _PERMISSION_FIELDS
+                       if (value := getattr(payload, field)) is not msgspec.UNSET}
+
+        if payload.password:
+            logger.debug(f"Updating password for user ID: {user_id}")
+            user_fields['password_hash'] = hash_password(payload.password)
+
+        db = get_db()
+        user_repo = g.user_repo
+        if not user_fields and not perm_fields:
+            # Nenhum campo atualizável no corpo: nada a gravar, apenas devolver o estado atual
+            updated_user = user_repo.find_by_id(db, user_id)
+            if not updated_user:
                 raise NotFoundError(f"User with ID {user_id} not found.")
+            logger.info(f"User ID {user_id} update skipped: no updatable fields in request.")
+            return jsonify(updated_user.to_dict(include_hash=False)), 200
 
-            # Atualizar campos do objeto User (a sessão rastreia as mudanças)
-            if 'name' in data: user.name = data['name']
-            if 'email' in data: user.email = data['email']
-            if 'is_active' in data: user.is_active = data['is_active']
-
-            new_password = data.get('password')
-            if new_password:
-                logger.debug(f"Updating password for user ID: {user_id}")
-                user.set_password(new_password)
-                if not user.password_hash:
-                     raise ValidationError("Failed to process new password.")
-
-            # Atualizar permissões (garantir que o objeto permissions existe)
-            if not user.permissions:
-                 logger.warning(f"User ID {user_id} found but missing permissions object during update. Creating default.")
-                 user.permissions = UserPermissions() # Cria default associado
-
-            # Atualizar campos do objeto UserPermissions
-            user.permissions.is_admin = data.get('is_admin', user.permissions.is_admin)
-            user.permissions.can_access_products = data.get('can_access_products', user.permissions.can_access_products)
-            user.permissions.can_access_fabrics = data.get('can_access_fabrics', user.permissions.can_access_fabrics)
-            user.permissions.can_access_customer_panel = data.get('can_access_customer_panel', user.permissions.can_access_customer_panel)
-            user.permissions.can_access_fiscal = data.get('can_access_fiscal', user.permissions.can_access_fiscal)
-            user.permissions.can_access_accounts_receivable = data.get('can_access_accounts_receivable', user.permissions.can_access_accounts_receivable)
-
-            # Chamar o update do repositório (que apenas faz flush opcionalmente)
-            # O commit será feito pelo get_db_session
-            updated_user = user_repo.update(db, user) # Passa sessão e objeto modificado
+        # UPDATE ... RETURNING: uma ida ao banco em vez de find_by_id + update + find_by_id.
+        # Valores iguais aos atuais não reescrevem a linha. Usuário inexistente -> NotFoundError.
+        updated_user = user_repo.update_and_return(db, user_id, user_fields, perm_fields)
+        db.commit()
 
         logger.info(f"User ID {user_id} update process completed.")
         # Retornar o usuário atualizado convertido para dict
@@ -211,16 +237,15 @@ def delete_user(user_id: int):
         raise ForbiddenError("Cannot delete your own user account.")
 
     try:
-        with get_db_session() as db:
-            user_repo = _get_user_repository()
-            success = user_repo.delete(db, user_id) # Passar sessão
-
-        if success:
-            logger.info(f"User ID {user_id} deleted successfully.")
-            return jsonify({"message": f"User ID {user_id} deleted successfully."}), 200
-        else:
-            # Se delete retornou False, significa que usuário não foi encontrado
+        db = get_db()
+        user_repo = g.user_repo
+        # DELETE ... RETURNING: sem busca prévia (uma ida ao banco, sem TOCTOU)
+        if not user_repo.delete_returning(db, user_id):
             raise NotFoundError(f"User with ID {user_id} not found for deletion.")
+        db.commit()
+
+        logger.info(f"User ID {user_id} deleted successfully.")
+        return jsonify({"message": f"User ID {user_id} deleted successfully."}), 200
 
     except ForbiddenError as e:
           return jsonify({"error": str(e)}), 403
@@ -231,4 +256,43 @@ def delete_user(user_id: int):
           return jsonify({"error": "Database error deleting user."}), 500
     except Exception as e:
         logger.error(f"Unexpected error deleting user ID {user_id}: {e}", exc_info=True)
-        return jsonify({"error": "An internal server error occurred while deleting user."}), 500
\ No newline at end of file
+        return jsonify({"error": "An internal server error occurred while deleting user."}), 500
+
+
+@users_bp.route('/bulk', methods=['DELETE'])
+@admin_required
+def bulk_delete_users():
+    """Deletes several users in one request: {"ids": [...]}. (Admin only)"""
+    logger.info("Bulk delete users request received.")
+    if not request.is_json:
+        return _static_error(_ERR_NOT_JSON)
+    try:
+        payload = msgspec.json.decode(request.get_data(cache=False), type=BulkDeleteUsersPayload)
+    except msgspec.DecodeError as e: # Inclui msgspec.ValidationError
+        logger.warning(f"Bulk delete users failed: invalid payload: {e}")
+        return jsonify({"error": f"Invalid request payload: {e}"}), 400
+
+    current_user = request.current_user # Set by @admin_required
+    requested_ids = list(dict.fromkeys(payload.ids)) # Remove duplicados mantendo a ordem
+    # O próprio usuário nunca é excluído (mesma regra do DELETE /<id>)
+    skipped = [user_id for user_id in requested_ids if user_id == current_user.id]
+    ids_to_delete = [user_id for user_id in requested_ids if user_id != current_user.id]
+
+    try:
+        db = get_db()
+        user_repo = g.user_repo
+        # Um único DELETE ... WHERE id IN (...) RETURNING id para todo o lote
+        deleted_ids = user_repo.delete_many(db, ids_to_delete)
+        db.commit()
+
+        deleted = [user_id for user_id in ids_to_delete if user_id in deleted_ids]
+        not_found = [user_id for user_id in ids_to_delete if user_id not in deleted_ids]
+        logger.info(f"Bulk delete: {len(deleted)} deleted, {len(not_found)} not found, {len(skipped)} skipped.")
+        return jsonify({"deleted": deleted, "not_found": not_found, "skipped": skipped}), 200
+
+    except (DatabaseError, SQLAlchemyError) as e:
+          logger.error(f"Database error bulk deleting users: {e}", exc_info=True)
+          return jsonify({"error": "Database error deleting users."}), 500
+    except Exception as e:
+        logger.error(f"Unexpected error bulk deleting users: {e}", exc_info=True)
+        return jsonify({"error": "An internal server error occurred while deleting users."}), 500
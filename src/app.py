@@ -1,29 +1,33 @@
 # src/app.py
 # Contains the Flask application factory using SQLAlchemy.
 
-from flask import Flask, jsonify
-from flask_cors import CORS
+from flask import Flask, jsonify, g
 import atexit
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List
 from sqlalchemy.exc import SQLAlchemyError
 
-from src.config import Config
-from src.api import register_blueprints
+from src.config import Config, log_config_summary
+from src.api import register_blueprints, preload_blueprints
 from src.api.errors import register_error_handlers, ConfigurationError, DatabaseError
+from src.api.cors import register_cors
 from src.database import (
-    get_db_session,
+    close_request_db,
     init_sqlalchemy,
+    get_user_repository,
+    get_observation_repository,
     dispose_sqlalchemy_engine,
     # Engine não precisa ser importado aqui diretamente
 )
 from src.utils.logger import logger, configure_logger
+from src.utils.json_provider import ORJSONProvider
 from src.utils.system_monitor import start_resource_monitor, stop_resource_monitor
+from src.utils.process_lock import try_acquire_process_lock
 
-# --- Importar Repositórios Diretamente ---
-from src.database.user_repository import UserRepository
-from src.database.observation_repository import ObservationRepository
-# ---------------------------------------
-
+from src.services.registry import LazyServiceRegistry
 from src.services import (
     AuthService,
     CustomerService,
@@ -34,12 +38,6 @@ from src.services import (
     AccountsReceivableService
 )
 
-# Remover import das funções fábrica dos repositórios
-# from src.database import (
-#     get_user_repository,
-#     get_observation_repository
-# )
-
 from src.erp_integration import (
     erp_auth_service,
     ErpBalanceService,
@@ -50,6 +48,35 @@ from src.erp_integration import (
     ErpAccountsReceivableService
 )
 
+# --- Shutdown Hooks ---
+# Um único atexit por processo, independente de quantas vezes create_app roda
+# (ex: fixtures de teste). Hooks são deduplicados e executados em ordem inversa
+# ao registro (mesma semântica do atexit); cada hook roda uma única vez.
+_shutdown_hooks: List[Callable[[], None]] = []
+_shutdown_lock = threading.Lock()
+_atexit_registered = False
+
+def _register_shutdown_hook(hook: Callable[[], None]) -> None:
+    """Adds a hook to the process shutdown sequence (ignored if already registered)."""
+    global _atexit_registered
+    with _shutdown_lock:
+        if hook not in _shutdown_hooks:
+            _shutdown_hooks.append(hook)
+        if not _atexit_registered:
+            atexit.register(_run_shutdown_hooks)
+            _atexit_registered = True
+
+def _run_shutdown_hooks() -> None:
+    """Runs and clears the registered shutdown hooks (safe to call more than once)."""
+    with _shutdown_lock:
+        hooks = _shutdown_hooks[::-1]
+        _shutdown_hooks.clear()
+    for hook in hooks:
+        try:
+            hook()
+        except Exception as e:
+            logger.error("Error running shutdown hook %s: %s", getattr(hook, '__name__', hook), e, exc_info=True)
+
 
 def create_app(config_object: Config) -> Flask:
     """
@@ -61,123 +88,169 @@ def create_app(config_object: Config) -> Flask:
     Returns:
         The configured Flask application instance.
     """
+    # Valores usados várias vezes pela factory: lidos uma vez do objeto de configuração
+    debug = bool(getattr(config_object, 'APP_DEBUG', False))
+    db_uri = getattr(config_object, 'SQLALCHEMY_DATABASE_URI', None)
+    log_level = config_object.LOG_LEVEL
+
     app = Flask(__name__)
     app.config.from_object(config_object)
+    # Serialização JSON (jsonify/get_json) via orjson em toda a aplicação
+    app.json = ORJSONProvider(app)
 
     # --- Logging ---
-    configure_logger(config_object.LOG_LEVEL)
+    configure_logger(log_level)
+    log_config_summary(config_object) # Depois do configure_logger: nível/handlers já definidos
     logger.info("Flask application factory started.")
-    logger.info(f"App Name: {app.name}")
-    logger.info(f"Debug Mode: {app.config.get('APP_DEBUG')}")
+    logger.info("App Name: %s", app.name)
+    logger.info("Debug Mode: %s", debug)
 
     # --- Secret Key Check ---
-    if not app.config.get('SECRET_KEY') or app.config.get('SECRET_KEY') == 'default_secret_key_change_me_in_env':
-            logger.critical("CRITICAL SECURITY WARNING: SECRET_KEY is not set or is using the default value!")
-            if not app.config.get('APP_DEBUG', False):
-                raise ConfigurationError("SECRET_KEY must be set to a secure, unique value in production.")
-            else:
-                logger.warning("Using default/insecure SECRET_KEY in debug mode.")
+    # Validado uma vez por processo em Config.__post_init__ (src/config/settings.py)
 
     # --- CORS Configuration ---
-    CORS(app, supports_credentials=True, resources={r"/api/*": {"origins": "*"}})
+    # Injetor de headers próprio (after_request) em vez do Flask-CORS
+    register_cors(app)
     logger.info("CORS configured to allow all origins (Update for production).")
 
+    # --- Pré-carga dos módulos de rotas ---
+    # Os imports das rotas rodam numa thread enquanto a thread principal conecta ao
+    # banco e inicializa o schema (I/O que libera o GIL). O registro em si continua
+    # na thread principal, em register_blueprints.
+    api_blueprints = app.config.get('API_BLUEPRINTS')
+    preload_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="blueprint-preload")
+    preload_future = preload_executor.submit(preload_blueprints, api_blueprints)
+    preload_executor.shutdown(wait=False) # Não aceita novas tarefas; a thread termina sozinha
+
     # --- Database Initialization (SQLAlchemy) ---
     db_engine = None # Para passar para os repositórios
     try:
-        db_uri = app.config.get('SQLALCHEMY_DATABASE_URI')
         if not db_uri:
              raise ConfigurationError("SQLALCHEMY_DATABASE_URI is not configured.")
 
         # init_sqlalchemy agora retorna o engine
-        db_engine = init_sqlalchemy(db_uri)
+        db_engine = init_sqlalchemy(
+            db_uri,
+            pool_size=app.config['SQLALCHEMY_POOL_SIZE'],
+            max_overflow=app.config['SQLALCHEMY_MAX_OVERFLOW'],
+            pool_recycle=app.config['SQLALCHEMY_POOL_RECYCLE'],
+            pool_pre_ping=app.config['SQLALCHEMY_POOL_PRE_PING'],
+            pool_use_lifo=app.config['SQLALCHEMY_POOL_USE_LIFO'],
+            poolclass=app.config['SQLALCHEMY_POOLCLASS'],
+            statement_timeout_ms=app.config['SQLALCHEMY_STATEMENT_TIMEOUT_MS'],
+            query_cache_size=app.config['SQLALCHEMY_QUERY_CACHE_SIZE'],
+            startup_probe=app.config['SQLALCHEMY_STARTUP_PROBE'],
+            run_schema_init=app.config['SQLALCHEMY_RUN_SCHEMA_INIT'],
+            echo=app.config['SQLALCHEMY_ECHO'],
+            echo_pool=app.config['SQLALCHEMY_ECHO_POOL'],
+            slow_query_ms=app.config['SQLALCHEMY_SLOW_QUERY_MS'],
+            insertmanyvalues_page_size=app.config['SQLALCHEMY_INSERTMANYVALUES_PAGE_SIZE'],
+        )
         logger.info("SQLAlchemy engine and session factory initialized successfully.")
 
-        atexit.register(dispose_sqlalchemy_engine)
+        _register_shutdown_hook(dispose_sqlalchemy_engine)
         logger.debug("Registered SQLAlchemy engine disposal for application exit.")
 
+        # Fecha a sessão lazy da requisição (get_db), se alguma foi aberta
+        app.teardown_request(close_request_db)
+
     except (DatabaseError, ConfigurationError, SQLAlchemyError) as db_init_err:
-        logger.critical(f"Failed to initialize database: {db_init_err}", exc_info=True)
+        logger.critical("Failed to initialize database: %s", db_init_err, exc_info=True)
         # Parar a app se o banco falhar é uma boa prática
-        import sys
-        sys.exit(1)
+        raise SystemExit(1)
     except Exception as generic_db_err:
-         logger.critical(f"Unexpected error during database initialization: {generic_db_err}", exc_info=True)
-         import sys
-         sys.exit(1)
+         logger.critical("Unexpected error during database initialization: %s", generic_db_err, exc_info=True)
+         raise SystemExit(1)
 
     # --- Dependency Injection (Service Instantiation) ---
     logger.info("Instantiating services...")
     if not db_engine:
          logger.critical("Database engine not available for service instantiation.")
-         import sys
-         sys.exit(1)
+         raise SystemExit(1)
 
     try:
-        # --- Instanciar Repositórios Diretamente ---
-        # Passar o engine obtido do init_sqlalchemy
-        user_repo = UserRepository(db_engine)
-        observation_repo = ObservationRepository(db_engine)
-        # -----------------------------------------
-
-        # Adicionar repositórios ao config da app para acesso fácil se necessário
-        # (ex: no helper _get_user_repository dentro de users.py)
-        app.config['user_repository'] = user_repo
-        app.config['observation_repository'] = observation_repo
-
-        # ERP Integration Services (permanece igual)
-        erp_balance_svc = ErpBalanceService(erp_auth_service)
-        erp_cost_svc = ErpCostService(erp_auth_service)
-        erp_person_svc = ErpPersonService(erp_auth_service)
-        erp_product_svc = ErpProductService(erp_auth_service)
-        erp_fiscal_svc = ErpFiscalService(erp_auth_service)
-        erp_ar_svc = ErpAccountsReceivableService(erp_auth_service)
-
-        # Application Services (recebem instâncias dos repositórios)
-        auth_svc = AuthService(user_repo)
-        customer_svc = CustomerService(erp_person_svc)
-        fabric_svc = FabricService(erp_balance_svc, erp_cost_svc, erp_product_svc)
-        observation_svc = ObservationService(observation_repo)
-        product_svc = ProductService(erp_balance_svc)
-        fiscal_svc = FiscalService(erp_fiscal_svc)
-        ar_svc = AccountsReceivableService(erp_ar_svc, erp_person_svc)
-
-        # Store service instances in app config
-        app.config['auth_service'] = auth_svc
-        app.config['customer_service'] = customer_svc
-        app.config['fabric_service'] = fabric_svc
-        app.config['observation_service'] = observation_svc
-        app.config['product_service'] = product_svc
-        app.config['fiscal_service'] = fiscal_svc
-        app.config['accounts_receivable_service'] = ar_svc
-        logger.info("Services instantiated and added to app config.")
+        # --- Repositórios (uma instância por engine, cacheada) ---
+        user_repo = get_user_repository(db_engine)
+        observation_repo = get_observation_repository(db_engine)
+
+        # Vincula o repositório em flask.g uma vez por requisição: as rotas usam
+        # g.user_repo sem resolver o proxy current_app a cada acesso.
+        @app.before_request
+        def _bind_request_context():
+            g.user_repo = user_repo
+
+        # Serviços registrados de forma lazy: cada um (e suas dependências ERP) só é
+        # instanciado na primeira vez que uma rota o resolve.
+        services = LazyServiceRegistry()
+        services.register_instance('user_repository', user_repo)
+        services.register_instance('observation_repository', observation_repo)
+        services.register_many({
+            # ERP Integration Services
+            'erp_balance': lambda r: ErpBalanceService(erp_auth_service),
+            'erp_cost': lambda r: ErpCostService(erp_auth_service),
+            'erp_person': lambda r: ErpPersonService(erp_auth_service),
+            'erp_product': lambda r: ErpProductService(erp_auth_service),
+            'erp_fiscal': lambda r: ErpFiscalService(erp_auth_service),
+            'erp_accounts_receivable': lambda r: ErpAccountsReceivableService(erp_auth_service),
+            # Application Services (recebem instâncias dos repositórios)
+            'auth_service': lambda r: AuthService(r['user_repository']),
+            'customer_service': lambda r: CustomerService(r['erp_person']),
+            'fabric_service': lambda r: FabricService(r['erp_balance'], r['erp_cost'], r['erp_product']),
+            'observation_service': lambda r: ObservationService(r['observation_repository']),
+            'product_service': lambda r: ProductService(r['erp_balance']),
+            'fiscal_service': lambda r: FiscalService(r['erp_fiscal']),
+            'accounts_receivable_service': lambda r: AccountsReceivableService(r['erp_accounts_receivable'], r['erp_person']),
+        })
+
+        # Repositórios (acesso fora de requisições) e registro de serviços
+        app.extensions.update({
+            'user_repository': user_repo,
+            'observation_repository': observation_repo,
+            'services': services,
+        })
+        logger.info("Service factories registered (services are instantiated on first use).")
 
     except Exception as service_init_err:
-        logger.critical(f"Failed to instantiate services: {service_init_err}", exc_info=True)
-        import sys
-        sys.exit(1)
+        logger.critical("Failed to instantiate services: %s", service_init_err, exc_info=True)
+        raise SystemExit(1)
 
     # --- Register Blueprints (API Routes) ---
-    register_blueprints(app)
+    # API_BLUEPRINTS (opcional, lista de prefixos) limita quais módulos de rotas são importados
+    preload_future.result() # Propaga erros de import da pré-carga
+    register_blueprints(app, only=api_blueprints)
 
     # --- Register Error Handlers ---
     register_error_handlers(app)
 
     # --- Resource Monitoring ---
+    # WERKZEUG_RUN_MAIN evita o processo do reloader; o file-lock garante um único
+    # monitor por host também com vários workers (gunicorn).
     if not app.debug or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
-        start_resource_monitor(interval_seconds=300)
-        atexit.register(stop_resource_monitor)
+        if try_acquire_process_lock('resource_monitor'):
+            start_resource_monitor(interval_seconds=300)
+            _register_shutdown_hook(stop_resource_monitor)
+        else:
+            logger.info("Resource monitor already running in another process; skipping.")
 
     # --- Simple Health Check Endpoint ---
+    # Ping direto no engine (SELECT 1 sem sessão/transação ORM), no máximo a cada
+    # HEALTH_DB_PING_INTERVAL segundos; entre pings usa o último resultado OK.
+    # Falhas não são cacheadas: o próximo probe tenta de novo.
+    health_ping_interval = float(app.config.get('HEALTH_DB_PING_INTERVAL', 30))
+    last_db_ping_ok = [0.0] # monotonic do último ping bem-sucedido
+
     @app.route('/health', methods=['GET'])
     def health_check():
         db_status = "ok"
-        try:
-             with get_db_session() as db:
-                  pass # Apenas obter a sessão testa a factory e o engine
-        except Exception as e:
-             logger.error(f"Health check database session failed: {e}")
-             db_status = "error"
+        now = time.monotonic()
+        if now - last_db_ping_ok[0] > health_ping_interval:
+            try:
+                with db_engine.connect() as connection:
+                    connection.exec_driver_sql("SELECT 1")
+                last_db_ping_ok[0] = now
+            except Exception as e:
+                logger.error("Health check database ping failed: %s", e)
+                db_status = "error"
 
         return jsonify({"status": "ok", "database": db_status}), 200 if db_status == "ok" else 503
 
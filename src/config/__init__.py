@@ -1,6 +1,12 @@
 # src/config/__init__.py
 # Makes 'config' a package. Exports relevant items.
 
-from .settings import config, Config, load_config
+from .settings import Config, load_config, log_config_summary, reset_config
 
-__all__ = ["config", "Config", "load_config"]
\ No newline at end of file
+__all__ = ["config", "Config", "load_config", "log_config_summary", "reset_config"]
+
+def __getattr__(name: str):
+    # 'config' é resolvido sob demanda (ver settings.__getattr__)
+    if name == 'config':
+        return load_config()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,148 +1,311 @@
 # src/config/settings.py
 # Loads environment variables and defines the application configuration.
 
-from dataclasses import dataclass, field
-from typing import Optional
+import functools
+from dataclasses import dataclass
+from typing import Dict, Optional, Union
 from dotenv import load_dotenv
 import os
 import logging
-import sys
-from urllib.parse import quote_plus # Para senhas na URL
+from pathlib import Path
+from sqlalchemy.engine import URL # URL estruturada: sem escaping manual nem re-parse
 
 # Determine the project root directory dynamically
-PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+PROJECT_ROOT = str(Path(__file__).resolve().parents[2]) # src/config/settings.py -> raiz
 dotenv_path = os.path.join(PROJECT_ROOT, '.env')
-load_dotenv(dotenv_path=dotenv_path)
-print(f"Loading .env file from: {dotenv_path}") # Debug print
 
-@dataclass
+# Mesmo logger nomeado configurado por src.utils.logger ("SaldoAPI"). Obtido direto do
+# módulo logging: importar src.utils.logger aqui criaria um ciclo (ele lê config.LOG_LEVEL).
+_logger = logging.getLogger("SaldoAPI")
+
+# Arquivos .env já carregados neste processo. globals().get() preserva o conjunto
+# em importlib.reload(), que reexecuta o módulo sobre o mesmo namespace.
+_loaded_dotenv_paths = globals().get('_loaded_dotenv_paths', set())
+
+def _load_dotenv_once(path: str) -> bool:
+    """Loads the given .env file at most once per process. Returns False if it was already loaded."""
+    if path in _loaded_dotenv_paths:
+        return False
+    _loaded_dotenv_paths.add(path)
+    _logger.debug("Loading .env file from: %s", path)
+    return load_dotenv(dotenv_path=path)
+
+_load_dotenv_once(dotenv_path)
+
+# Valores de SECRET_KEY que nunca podem ser usados em produção
+_INSECURE_SECRET_KEYS = frozenset({'default_secret_key_change_me_in_env', '', None})
+
+# Endpoints da API do ERP (relativos a API_BASE_URL): variável de ambiente -> valor padrão
+_ENDPOINT_DEFAULTS: Dict[str, str] = {
+    'BALANCES_ENDPOINT': '/product/v2/balances/search',
+    'COSTS_ENDPOINT': '/product/v2/costs/search',
+    'PRODUCTS_ENDPOINT': '/product/v2/products/search',
+    'INDIVIDUALS_ENDPOINT': '/person/v2/individuals/search',
+    'LEGAL_ENTITIES_ENDPOINT': '/person/v2/legal-entities/search',
+    'PERSON_STATS_ENDPOINT': '/person/v2/person-statistics',
+    'TOKEN_ENDPOINT': '/authorization/v2/token',
+    'ACCOUNTS_RECEIVABLE_DOCUMENTS_ENDPOINT': '/accounts-receivable/v2/documents/search',
+    'ACCOUNTS_RECEIVABLE_BANKSLIP_ENDPOINT': '/accounts-receivable/v2/bank-slip',
+    'ACCOUNTS_RECEIVABLE_PAYMENTLINK_ENDPOINT': '/accounts-receivable/v2/payment-link',
+    'FISCAL_INVOICES_ENDPOINT': '/fiscal/v2/invoices/search',
+    'FISCAL_XML_ENDPOINT': '/fiscal/v2/xml-contents',
+    'FISCAL_DANFE_ENDPOINT': '/fiscal/v2/danfe-search',
+}
+
+# Tamanho padrão do pool do SQLAlchemy: proporcional às CPUs do host (mínimo 5)
+_DEFAULT_POOL_SIZE = max(5, (os.cpu_count() or 1) * 2)
+
+# Nomes de nível aceitos em LOG_LEVEL (montado uma vez, não a cada Config())
+_VALID_LOG_LEVELS = frozenset(logging._nameToLevel)
+
+@dataclass(init=False, frozen=True, slots=True, eq=False, repr=False)
 class Config:
     """
     Application configuration loaded from environment variables.
     Provides type hints and default values.
+    Values are read in __init__ from a single snapshot of os.environ. Instances are
+    immutable (frozen, __slots__): fields are only assigned during construction.
     """
     # Flask Settings
-    SECRET_KEY: str = field(default_factory=lambda: os.environ.get('SECRET_KEY', 'default_secret_key_change_me_in_env'))
-    APP_HOST: str = field(default_factory=lambda: os.environ.get('APP_HOST', '0.0.0.0'))
-    APP_PORT: int = field(default_factory=lambda: int(os.environ.get('APP_PORT', 5004)))
-    APP_DEBUG: bool = field(default_factory=lambda: os.environ.get('APP_DEBUG', 'True').lower() == 'true')
-    TOKEN_EXPIRATION_HOURS: int = field(default_factory=lambda: int(os.environ.get('TOKEN_EXPIRATION_HOURS', 24)))
-    LOG_LEVEL: str = field(default_factory=lambda: os.environ.get('LOG_LEVEL', 'DEBUG').upper())
+    SECRET_KEY: str
+    APP_HOST: str
+    APP_PORT: int
+    APP_DEBUG: bool
+    TOKEN_EXPIRATION_HOURS: int
+    LOG_LEVEL: str
 
     # --- Database Settings ---
-    DB_TYPE: str = field(default_factory=lambda: os.environ.get('DB_TYPE', 'POSTGRES').upper()) # Default to POSTGRES
+    DB_TYPE: str
 
     # PostgreSQL Specific Settings (read from .env)
-    POSTGRES_HOST: str = field(default_factory=lambda: os.environ.get('POSTGRES_HOST', 'localhost'))
-    POSTGRES_PORT: int = field(default_factory=lambda: int(os.environ.get('POSTGRES_PORT', 5432)))
-    POSTGRES_USER: str = field(default_factory=lambda: os.environ.get('POSTGRES_USER', ''))
-    POSTGRES_PASSWORD: str = field(default_factory=lambda: os.environ.get('POSTGRES_PASSWORD', ''))
-    POSTGRES_DB: str = field(default_factory=lambda: os.environ.get('POSTGRES_DB', ''))
+    POSTGRES_HOST: str
+    POSTGRES_PORT: int
+    POSTGRES_USER: str
+    POSTGRES_PASSWORD: str
+    POSTGRES_DB: str
+
+    # --- SQLAlchemy Engine / Pool Settings ---
+    # Conexão direta ao PostgreSQL: manter PRE_PING=True. Atrás do PgBouncer (modo
+    # transaction): PRE_PING=False e POOL_RECYCLE curto (ex: 60).
+    SQLALCHEMY_POOL_SIZE: int
+    SQLALCHEMY_MAX_OVERFLOW: int
+    SQLALCHEMY_POOL_RECYCLE: int
+    SQLALCHEMY_POOL_PRE_PING: bool
+    SQLALCHEMY_POOL_USE_LIFO: bool
+    SQLALCHEMY_POOLCLASS: Optional[str]
+    SQLALCHEMY_QUERY_CACHE_SIZE: int
+    SQLALCHEMY_STATEMENT_TIMEOUT_MS: int
+    SQLALCHEMY_STARTUP_PROBE: bool
+    SQLALCHEMY_RUN_SCHEMA_INIT: bool
+    SQLALCHEMY_ECHO: bool
+    SQLALCHEMY_ECHO_POOL: Union[bool, str]
+    SQLALCHEMY_SLOW_QUERY_MS: int
+    SQLALCHEMY_INSERTMANYVALUES_PAGE_SIZE: int
 
     # --- SQLAlchemy Database URL ---
-    # Constructed based on the DB_TYPE and specific settings
-    SQLALCHEMY_DATABASE_URI: Optional[str] = None
+    # Constructed based on the DB_TYPE and specific settings (sqlalchemy.engine.URL,
+    # accepted directly by create_engine; use str()/render_as_string() if a string is needed)
+    SQLALCHEMY_DATABASE_URI: Optional[URL]
 
     # TOTVS ERP Company Code
-    COMPANY_CODE: int = field(default_factory=lambda: int(os.environ.get('COMPANY_CODE', 1)))
+    COMPANY_CODE: int
 
     # TOTVS ERP API Integration Settings
-    API_BASE_URL: str = field(default_factory=lambda: os.environ.get('API_BASE_URL', 'http://10.1.1.221:11980/api/totvsmoda'))
-    PAGE_SIZE: int = field(default_factory=lambda: int(os.environ.get('PAGE_SIZE', 1000)))
-    FISCAL_PAGE_SIZE: int = field(default_factory=lambda: min(int(os.environ.get('FISCAL_PAGE_SIZE', 50)), 100))
-    MAX_RETRIES: int = field(default_factory=lambda: int(os.environ.get('MAX_RETRIES', 3)))
-
-    # TOTVS ERP API Endpoints (relative to API_BASE_URL)
-    BALANCES_ENDPOINT: str = field(default_factory=lambda: os.environ.get('BALANCES_ENDPOINT', '/product/v2/balances/search'))
-    COSTS_ENDPOINT: str = field(default_factory=lambda: os.environ.get('COSTS_ENDPOINT', '/product/v2/costs/search'))
-    PRODUCTS_ENDPOINT: str = field(default_factory=lambda: os.environ.get('PRODUCTS_ENDPOINT', '/product/v2/products/search'))
-    INDIVIDUALS_ENDPOINT: str = field(default_factory=lambda: os.environ.get('INDIVIDUALS_ENDPOINT', '/person/v2/individuals/search'))
-    LEGAL_ENTITIES_ENDPOINT: str = field(default_factory=lambda: os.environ.get('LEGAL_ENTITIES_ENDPOINT', '/person/v2/legal-entities/search'))
-    PERSON_STATS_ENDPOINT: str = field(default_factory=lambda: os.environ.get('PERSON_STATS_ENDPOINT', '/person/v2/person-statistics'))
-    TOKEN_ENDPOINT: str = field(default_factory=lambda: os.environ.get('TOKEN_ENDPOINT', '/authorization/v2/token'))
-    ACCOUNTS_RECEIVABLE_DOCUMENTS_ENDPOINT: str = field(default_factory=lambda: os.environ.get('ACCOUNTS_RECEIVABLE_DOCUMENTS_ENDPOINT', '/accounts-receivable/v2/documents/search'))
-    ACCOUNTS_RECEIVABLE_BANKSLIP_ENDPOINT: str = field(default_factory=lambda: os.environ.get('ACCOUNTS_RECEIVABLE_BANKSLIP_ENDPOINT', '/accounts-receivable/v2/bank-slip'))
-    ACCOUNTS_RECEIVABLE_PAYMENTLINK_ENDPOINT: str = field(default_factory=lambda: os.environ.get('ACCOUNTS_RECEIVABLE_PAYMENTLINK_ENDPOINT', '/accounts-receivable/v2/payment-link'))
-    FISCAL_INVOICES_ENDPOINT: str = field(default_factory=lambda: os.environ.get('FISCAL_INVOICES_ENDPOINT', '/fiscal/v2/invoices/search'))
-    FISCAL_XML_ENDPOINT: str = field(default_factory=lambda: os.environ.get('FISCAL_XML_ENDPOINT', '/fiscal/v2/xml-contents'))
-    FISCAL_DANFE_ENDPOINT: str = field(default_factory=lambda: os.environ.get('FISCAL_DANFE_ENDPOINT', '/fiscal/v2/danfe-search'))
+    API_BASE_URL: str
+    PAGE_SIZE: int
+    FISCAL_PAGE_SIZE: int
+    MAX_RETRIES: int
+
+    # TOTVS ERP API Endpoints (relative to API_BASE_URL), keyed by env var name.
+    # Also readable as attributes (config.BALANCES_ENDPOINT) via __getattr__.
+    ENDPOINTS: Dict[str, str]
 
     # TOTVS ERP API Credentials
-    API_USERNAME: str = field(default_factory=lambda: os.environ.get('API_USERNAME', ''))
-    API_PASSWORD: str = field(default_factory=lambda: os.environ.get('API_PASSWORD', ''))
-    CLIENT_ID: str = field(default_factory=lambda: os.environ.get('CLIENT_ID', 'kduapiv2'))
-    CLIENT_SECRET: str = field(default_factory=lambda: os.environ.get('CLIENT_SECRET', ''))
-    GRANT_TYPE: str = field(default_factory=lambda: os.environ.get('GRANT_TYPE', 'password'))
+    API_USERNAME: str
+    API_PASSWORD: str
+    CLIENT_ID: str
+    CLIENT_SECRET: str
+    GRANT_TYPE: str
+
+    def __init__(self):
+        env = os.environ.copy() # Uma única leitura do ambiente para todos os campos
+        assign = functools.partial(object.__setattr__, self) # Config é frozen
+
+        # Flask Settings
+        assign('SECRET_KEY', env.get('SECRET_KEY', 'default_secret_key_change_me_in_env'))
+        assign('APP_HOST', env.get('APP_HOST', '0.0.0.0'))
+        assign('APP_PORT', int(env.get('APP_PORT', 5004)))
+        assign('APP_DEBUG', env.get('APP_DEBUG', 'True').lower() == 'true')
+        assign('TOKEN_EXPIRATION_HOURS', int(env.get('TOKEN_EXPIRATION_HOURS', 24)))
+        assign('LOG_LEVEL', env.get('LOG_LEVEL', 'DEBUG').upper())
+
+        # --- Database Settings ---
+        assign('DB_TYPE', env.get('DB_TYPE', 'POSTGRES').upper()) # Default to POSTGRES
+
+        # PostgreSQL Specific Settings (read from .env)
+        assign('POSTGRES_HOST', env.get('POSTGRES_HOST', 'localhost'))
+        assign('POSTGRES_PORT', int(env.get('POSTGRES_PORT', 5432)))
+        assign('POSTGRES_USER', env.get('POSTGRES_USER', ''))
+        assign('POSTGRES_PASSWORD', env.get('POSTGRES_PASSWORD', ''))
+        assign('POSTGRES_DB', env.get('POSTGRES_DB', ''))
+
+        # --- SQLAlchemy Engine / Pool Settings ---
+        # Conexão direta ao PostgreSQL: manter PRE_PING=True. Atrás do PgBouncer (modo
+        # transaction): PRE_PING=False e POOL_RECYCLE curto (ex: 60).
+        assign('SQLALCHEMY_POOL_SIZE', int(env.get('SQLALCHEMY_POOL_SIZE', _DEFAULT_POOL_SIZE)))
+        assign('SQLALCHEMY_MAX_OVERFLOW', int(env.get('SQLALCHEMY_MAX_OVERFLOW', 20)))
+        assign('SQLALCHEMY_POOL_RECYCLE', int(env.get('SQLALCHEMY_POOL_RECYCLE', 300))) # Abaixo dos timeouts de ociosidade de firewalls/NAT
+        assign('SQLALCHEMY_POOL_PRE_PING', env.get('SQLALCHEMY_POOL_PRE_PING', 'True').lower() == 'true')
+        assign('SQLALCHEMY_POOL_USE_LIFO', env.get('SQLALCHEMY_POOL_USE_LIFO', 'True').lower() == 'true') # Reutiliza a conexão mais recente
+        assign('SQLALCHEMY_POOLCLASS', env.get('SQLALCHEMY_POOLCLASS') or None) # Ex: 'QueuePool', 'NullPool'
+        assign('SQLALCHEMY_QUERY_CACHE_SIZE', int(env.get('SQLALCHEMY_QUERY_CACHE_SIZE', 1200))) # Cache de SQL compilado
+        assign('SQLALCHEMY_STATEMENT_TIMEOUT_MS', int(env.get('SQLALCHEMY_STATEMENT_TIMEOUT_MS', 0))) # 0 (padrão) = sem limite
+        assign('SQLALCHEMY_STARTUP_PROBE', env.get('SQLALCHEMY_STARTUP_PROBE', 'False').lower() == 'true') # Conexão de teste extra no startup
+        assign('SQLALCHEMY_RUN_SCHEMA_INIT', env.get('SQLALCHEMY_RUN_SCHEMA_INIT', 'True').lower() == 'true') # False: schema só via Alembic
+        # Diagnóstico sem mudar código: log de SQL/pool do SQLAlchemy e de queries lentas
+        assign('SQLALCHEMY_ECHO', env.get('SQLALCHEMY_ECHO', 'False').lower() == 'true')
+        echo_pool = env.get('SQLALCHEMY_ECHO_POOL', 'False').lower()
+        assign('SQLALCHEMY_ECHO_POOL', 'debug' if echo_pool == 'debug' else echo_pool == 'true')
+        assign('SQLALCHEMY_SLOW_QUERY_MS', int(env.get('SQLALCHEMY_SLOW_QUERY_MS', 0))) # 0 = desativado
+        assign('SQLALCHEMY_INSERTMANYVALUES_PAGE_SIZE', int(env.get('SQLALCHEMY_INSERTMANYVALUES_PAGE_SIZE', 1000))) # Linhas por INSERT em lote
+
+        # --- SQLAlchemy Database URL ---
+        # Constructed based on the DB_TYPE and specific settings
+        assign('SQLALCHEMY_DATABASE_URI', None)
+
+        # TOTVS ERP Company Code
+        assign('COMPANY_CODE', int(env.get('COMPANY_CODE', 1)))
+
+        # TOTVS ERP API Integration Settings
+        assign('API_BASE_URL', env.get('API_BASE_URL', 'http://10.1.1.221:11980/api/totvsmoda'))
+        assign('PAGE_SIZE', int(env.get('PAGE_SIZE', 1000)))
+        assign('FISCAL_PAGE_SIZE', min(int(env.get('FISCAL_PAGE_SIZE', 50)), 100))
+        assign('MAX_RETRIES', int(env.get('MAX_RETRIES', 3)))
+
+        # TOTVS ERP API Endpoints (relative to API_BASE_URL)
+        assign('ENDPOINTS', {name: env.get(name, default) for name, default in _ENDPOINT_DEFAULTS.items()})
+
+        # TOTVS ERP API Credentials
+        assign('API_USERNAME', env.get('API_USERNAME', ''))
+        assign('API_PASSWORD', env.get('API_PASSWORD', ''))
+        assign('CLIENT_ID', env.get('CLIENT_ID', 'kduapiv2'))
+        assign('CLIENT_SECRET', env.get('CLIENT_SECRET', ''))
+        assign('GRANT_TYPE', env.get('GRANT_TYPE', 'password'))
+
+        self.__post_init__()
+
+    def __getattr__(self, name: str) -> str:
+        # Só é chamado quando o atributo não existe: compatibilidade com config.<NOME>_ENDPOINT
+        if name in _ENDPOINT_DEFAULTS:
+            return self.ENDPOINTS[name]
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
 
     def __post_init__(self):
+        assign = functools.partial(object.__setattr__, self) # Config é frozen
+
+        # Validate SECRET_KEY (once per Config, not on every create_app call)
+        if self.SECRET_KEY in _INSECURE_SECRET_KEYS:
+            _logger.critical("CRITICAL SECURITY WARNING: SECRET_KEY is not set or is using the default value!")
+            if not self.APP_DEBUG:
+                from src.api.errors import ConfigurationError # Importação local (evita ciclo no import da config)
+                raise ConfigurationError("SECRET_KEY must be set to a secure, unique value in production.")
+            _logger.warning("Using default/insecure SECRET_KEY in debug mode.")
+
         # Validate log level
-        valid_levels = list(logging._nameToLevel.keys())
-        if self.LOG_LEVEL not in valid_levels:
-             print(f"Warning: Invalid LOG_LEVEL '{self.LOG_LEVEL}'. Valid levels: {valid_levels}. Defaulting to DEBUG.", file=sys.stderr)
-             self.LOG_LEVEL = 'DEBUG'
+        if self.LOG_LEVEL not in _VALID_LOG_LEVELS:
+             _logger.warning("Invalid LOG_LEVEL '%s'. Valid levels: %s. Defaulting to DEBUG.", self.LOG_LEVEL, sorted(_VALID_LOG_LEVELS))
+             assign('LOG_LEVEL', 'DEBUG')
 
         # --- Build SQLAlchemy Database URI ---
         if self.DB_TYPE == 'POSTGRES':
             if not all([self.POSTGRES_HOST, self.POSTGRES_USER, self.POSTGRES_PASSWORD, self.POSTGRES_DB]):
-                print("Warning: Missing PostgreSQL connection details in environment variables. Database connection will likely fail.", file=sys.stderr)
-                self.SQLALCHEMY_DATABASE_URI = None
+                _logger.warning("Missing PostgreSQL connection details in environment variables. Database connection will likely fail.")
+                assign('SQLALCHEMY_DATABASE_URI', None)
             else:
-                 # Use quote_plus for password in case it has special characters
-                 encoded_password = quote_plus(self.POSTGRES_PASSWORD)
+                 # URL.create recebe a senha crua (caracteres especiais são tratados pelo SQLAlchemy)
                  # Specify the driver (+psycopg)
-                 self.SQLALCHEMY_DATABASE_URI = f"postgresql+psycopg://{self.POSTGRES_USER}:{encoded_password}@{self.POSTGRES_HOST}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
+                 assign('SQLALCHEMY_DATABASE_URI', URL.create(
+                     drivername='postgresql+psycopg',
+                     username=self.POSTGRES_USER,
+                     password=self.POSTGRES_PASSWORD,
+                     host=self.POSTGRES_HOST,
+                     port=self.POSTGRES_PORT,
+                     database=self.POSTGRES_DB,
+                 ))
         elif self.DB_TYPE == 'SQLITE':
              # Keep SQLite support if needed temporarily (requires DATABASE_PATH in .env)
              db_path = os.environ.get('DATABASE_PATH')
              if db_path:
                   abs_path = os.path.join(PROJECT_ROOT, db_path) if not os.path.isabs(db_path) else db_path
-                  os.makedirs(os.path.dirname(abs_path), exist_ok=True)
-                  self.SQLALCHEMY_DATABASE_URI = f"sqlite:///{abs_path}"
+                  db_dir = os.path.dirname(abs_path)
+                  if db_dir and not os.path.isdir(db_dir): # Um único stat no caso comum (diretório já existe)
+                       os.makedirs(db_dir, exist_ok=True)
+                  assign('SQLALCHEMY_DATABASE_URI', URL.create('sqlite', database=abs_path))
              else:
-                  print("Warning: DB_TYPE is SQLITE but DATABASE_PATH is not set.", file=sys.stderr)
-                  self.SQLALCHEMY_DATABASE_URI = None
+                  _logger.warning("DB_TYPE is SQLITE but DATABASE_PATH is not set.")
+                  assign('SQLALCHEMY_DATABASE_URI', None)
         else:
-             print(f"Warning: Unsupported DB_TYPE '{self.DB_TYPE}'. No database URI configured.", file=sys.stderr)
-             self.SQLALCHEMY_DATABASE_URI = None
+             _logger.warning("Unsupported DB_TYPE '%s'. No database URI configured.", self.DB_TYPE)
+             assign('SQLALCHEMY_DATABASE_URI', None)
 
         # Validate Fiscal Page Size
         if self.FISCAL_PAGE_SIZE > 100:
-            print(f"Warning: FISCAL_PAGE_SIZE ({self.FISCAL_PAGE_SIZE}) exceeds ERP limit of 100. Clamping to 100.", file=sys.stderr)
-            self.FISCAL_PAGE_SIZE = 100
+            _logger.warning("FISCAL_PAGE_SIZE (%s) exceeds ERP limit of 100. Clamping to 100.", self.FISCAL_PAGE_SIZE)
+            assign('FISCAL_PAGE_SIZE', 100)
         elif self.FISCAL_PAGE_SIZE < 1:
-            print(f"Warning: FISCAL_PAGE_SIZE ({self.FISCAL_PAGE_SIZE}) is invalid. Setting to default 50.", file=sys.stderr)
-            self.FISCAL_PAGE_SIZE = 50
-
-# Singleton instance, created by load_config
-_config_instance: Optional[Config] = None
+            _logger.warning("FISCAL_PAGE_SIZE (%s) is invalid. Setting to default 50.", self.FISCAL_PAGE_SIZE)
+            assign('FISCAL_PAGE_SIZE', 50)
 
+# Singleton instance: load_config() is memoized; reset_config() forces a reload
+@functools.cache
 def load_config() -> Config:
     """Loads or returns the singleton Config instance."""
-    global _config_instance
-    if _config_instance is None:
-        _config_instance = Config()
-        # Log loaded config values (mask sensitive ones)
-        print("--- Configuration Loaded ---")
-        print(f"  APP_HOST: {_config_instance.APP_HOST}")
-        print(f"  APP_PORT: {_config_instance.APP_PORT}")
-        print(f"  APP_DEBUG: {_config_instance.APP_DEBUG}")
-        print(f"  LOG_LEVEL: {_config_instance.LOG_LEVEL}")
-        print(f"  DB_TYPE: {_config_instance.DB_TYPE}")
+    return Config()
+
+def log_config_summary(config_instance: Config) -> None:
+    """
+    Logs the loaded configuration (sensitive values masked) at DEBUG level.
+    Call after configure_logger(): load_config() itself may run before the
+    "SaldoAPI" logger has its level set (e.g. from src.utils.logger).
+    """
+    # Log loaded config values (mask sensitive ones). Só formata se DEBUG estiver ativo.
+    if _logger.isEnabledFor(logging.DEBUG):
         # Mask password in logged URI
-        db_uri_log = str(_config_instance.SQLALCHEMY_DATABASE_URI)
-        if _config_instance.POSTGRES_PASSWORD:
-             db_uri_log = db_uri_log.replace(quote_plus(_config_instance.POSTGRES_PASSWORD), '********')
-        print(f"  SQLALCHEMY_DATABASE_URI: {db_uri_log}")
-        print(f"  API_BASE_URL: {_config_instance.API_BASE_URL}")
-        print(f"  API_USERNAME: {'*' * len(_config_instance.API_USERNAME) if _config_instance.API_USERNAME else 'Not Set'}")
-        print(f"  COMPANY_CODE: {_config_instance.COMPANY_CODE}")
-        print(f"  PAGE_SIZE (General): {_config_instance.PAGE_SIZE}")
-        print(f"  FISCAL_PAGE_SIZE: {_config_instance.FISCAL_PAGE_SIZE}")
-        print("--------------------------")
-    return _config_instance
-
-# Expose the singleton instance directly
-config = load_config()
+        db_uri = config_instance.SQLALCHEMY_DATABASE_URI
+        db_uri_log = db_uri.render_as_string(hide_password=True) if db_uri is not None else None
+        _logger.debug("--- Configuration Loaded ---")
+        _logger.debug("  .env: %s (%s)", dotenv_path, 'found' if os.path.isfile(dotenv_path) else 'not found')
+        _logger.debug("  APP_HOST: %s", config_instance.APP_HOST)
+        _logger.debug("  APP_PORT: %s", config_instance.APP_PORT)
+        _logger.debug("  APP_DEBUG: %s", config_instance.APP_DEBUG)
+        _logger.debug("  LOG_LEVEL: %s", config_instance.LOG_LEVEL)
+        _logger.debug("  DB_TYPE: %s", config_instance.DB_TYPE)
+        _logger.debug("  SQLALCHEMY_DATABASE_URI: %s", db_uri_log)
+        _logger.debug("  API_BASE_URL: %s", config_instance.API_BASE_URL)
+        _logger.debug("  API_USERNAME: %s", '*' * len(config_instance.API_USERNAME) if config_instance.API_USERNAME else 'Not Set')
+        _logger.debug("  COMPANY_CODE: %s", config_instance.COMPANY_CODE)
+        _logger.debug("  PAGE_SIZE (General): %s", config_instance.PAGE_SIZE)
+        _logger.debug("  FISCAL_PAGE_SIZE: %s", config_instance.FISCAL_PAGE_SIZE)
+        _logger.debug("--------------------------")
+
+def reset_config() -> None:
+    """
+    Drops the cached Config so the next load_config() (or access to the module-level
+    'config') re-reads the environment, e.g. in tests. Names already bound through
+    'from src.config import config' keep pointing to the old instance.
+    """
+    load_config.cache_clear()
+    globals().pop('config', None)
+
+def __getattr__(name: str):
+    """
+    Lazy module attribute (PEP 562): 'config' is only built on first access, so
+    importing this module (Alembic, tooling) does not parse/validate the settings.
+    """
+    if name == 'config':
+        globals()['config'] = load_config() # Próximos acessos não passam mais por aqui
+        return globals()['config']
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # Helper to get PROJECT_ROOT if needed elsewhere
 def get_project_root() -> str:
@@ -1,39 +1,104 @@
 # src/database/__init__.py
 # Initializes SQLAlchemy components: Engine, SessionLocal, Base metadata.
-# Uses local imports for logger/errors to prevent circular dependencies during Alembic runs.
+# Logger/errors are imported lazily (once) to prevent circular dependencies during Alembic runs.
 
+import functools
 import threading
-from typing import Optional, Generator
-from contextlib import contextmanager
-from sqlalchemy import create_engine
-from sqlalchemy.engine import Engine
-from sqlalchemy.orm import sessionmaker, Session
+import time
+from typing import Optional, Union
+from sqlalchemy import create_engine, event
+from sqlalchemy import pool as sqlalchemy_pool
+from sqlalchemy.engine import Engine, URL, make_url
+from sqlalchemy.orm import scoped_session, sessionmaker, Session
 from sqlalchemy.exc import SQLAlchemyError
 
 # Importar Base diretamente - ESSENCIAL para Alembic
 from .base import Base
 # NÃO importar logger, errors, ConfigurationError, SchemaManager aqui no topo
+# (logger/errors são vinculados uma única vez por _load_deps(), abaixo)
 
 # --- SQLAlchemy Engine and Session Factory Globals ---
 _sqla_engine: Optional[Engine] = None
 _SessionLocalFactory: Optional[sessionmaker[Session]] = None
+_ScopedSession: Optional[scoped_session[Session]] = None # Registro por thread usado por get_db_session
 _engine_lock = threading.Lock()
 
+# --- Dependências carregadas sob demanda ---
+# Preenchidas por _load_deps() na primeira chamada de init_sqlalchemy: importar
+# src.utils.logger/src.api.errors no topo puxaria Flask e handlers de log para o
+# Alembic. Depois disso, get_db_session() as usa sem passar pelo import a cada sessão.
+_logger = None
+_DatabaseError = None
+_ConfigurationError = None
+
+def _load_deps() -> None:
+    """Binds logger and error classes to module globals (idempotent)."""
+    global _logger, _DatabaseError, _ConfigurationError
+    if _logger is not None:
+        return
+    from src.utils.logger import logger
+    from src.api.errors import DatabaseError, ConfigurationError
+    _DatabaseError, _ConfigurationError = DatabaseError, ConfigurationError
+    _logger = logger # Por último: sinaliza que todas as dependências estão prontas
+
 # --- Função de Inicialização do Engine e Session Factory ---
-def init_sqlalchemy(database_uri: str, pool_size: int = 10, max_overflow: int = 20) -> Engine:
+def init_sqlalchemy(
+    database_uri: Union[str, URL],
+    pool_size: int = 10,
+    max_overflow: int = 20,
+    pool_recycle: int = 300,
+    pool_pre_ping: bool = True,
+    pool_use_lifo: bool = True,
+    poolclass: Optional[str] = None,
+    statement_timeout_ms: Optional[int] = 0,
+    warmup_connections: Optional[int] = None,
+    query_cache_size: int = 1200,
+    startup_probe: bool = False,
+    run_schema_init: bool = True,
+    application_name: str = 'kdu_saldo_backend',
+    echo: bool = False,
+    echo_pool: Union[bool, str] = False,
+    slow_query_ms: int = 0,
+    insertmanyvalues_page_size: int = 1000,
+) -> Engine:
     """
     Initializes the SQLAlchemy engine, session factory, and database schema.
     Should be called once during application startup.
-    Uses local imports for logger/errors.
+    Logger/errors are imported lazily (see _load_deps).
+
+    Connections are recycled after 'pool_recycle' seconds and, if
+    'pool_pre_ping' is set, checked on checkout (disable it behind PgBouncer in
+    transaction mode). With 'pool_use_lifo' the most recently returned connection is
+    reused first, so surplus idle connections age out via pool_recycle. 'poolclass' is a sqlalchemy.pool class name
+    (e.g. 'QueuePool', 'NullPool'); None keeps the dialect default.
+    On PostgreSQL, connections report 'application_name', run with JIT disabled,
+    and 'statement_timeout_ms' caps each statement server-side (opt-in; None/0, the default, means no limit). 'warmup_connections' connections (default: pool_size)
+    are opened by a background thread at startup so the first requests don't pay
+    the connection handshake.
+    'query_cache_size' sizes the engine's compiled-SQL LRU cache (SQLAlchemy default: 500).
+    'echo'/'echo_pool' turn on SQLAlchemy's SQL/pool logging (echo_pool='debug' for
+    checkout/checkin details); 'slow_query_ms' > 0 logs statements slower than that.
+    'insertmanyvalues_page_size' is the number of rows per multi-row INSERT batch when
+    executing insert(Model) with a list of parameter sets.
+    'startup_probe' opens a dedicated test connection before the schema check; off by
+    default, since the schema initialization already connects (and fails) synchronously.
+    'run_schema_init' runs SchemaManager (create_all + default admin user); production
+    deployments whose schema is driven by Alembic can turn it off.
     """
-    # --- Importações locais ---
-    from src.utils.logger import logger # Importa logger aqui
-    from src.api.errors import DatabaseError, ConfigurationError # Importa errors aqui
-    # -------------------------
+    _load_deps() # Importa logger/errors uma única vez por processo
+    logger, DatabaseError, ConfigurationError = _logger, _DatabaseError, _ConfigurationError
+
+    global _sqla_engine, _SessionLocalFactory, _ScopedSession
+    # Caminho rápido sem lock: _sqla_engine só é publicado depois da session factory,
+    # então um engine não-nulo aqui já está completamente inicializado. O global é lido
+    # uma única vez (cópia local): um dispose concorrente não faz retornar None.
+    engine_snapshot = _sqla_engine
+    if engine_snapshot is not None and _SessionLocalFactory is not None:
+        logger.warning("SQLAlchemy engine and session factory already initialized.")
+        return engine_snapshot
 
-    global _sqla_engine, _SessionLocalFactory
     with _engine_lock:
-        if _sqla_engine and _SessionLocalFactory:
+        if _sqla_engine is not None and _SessionLocalFactory is not None: # Outra thread pode ter inicializado enquanto esperávamos
             logger.warning("SQLAlchemy engine and session factory already initialized.")
             return _sqla_engine
 
@@ -43,48 +108,116 @@ def init_sqlalchemy(database_uri: str, pool_size: int = 10, max_overflow: int =
             # logger.critical("Database URI is not configured. Cannot initialize SQLAlchemy.")
             raise ConfigurationError("Database URI is missing in configuration.")
 
-        logger.info(f"Initializing SQLAlchemy engine and session factory...")
         try:
+            # URL parseada uma vez: usada no log (senha mascarada), no dialeto e no create_engine
+            url = make_url(database_uri)
+            logger.info("Initializing SQLAlchemy engine and session factory for %s...", url.render_as_string(hide_password=True))
+
             # 1. Create the Engine
+            connect_args = {}
+            if url.get_backend_name() == 'postgresql':
+                # Identifica as conexões em pg_stat_activity
+                connect_args['application_name'] = application_name
+                # JIT do PG só atrasa as queries OLTP curtas desta API
+                pg_options = ["-c jit=off"]
+                if statement_timeout_ms:
+                    # Limite no servidor para queries descontroladas
+                    pg_options.append(f"-c statement_timeout={int(statement_timeout_ms)}")
+                connect_args['options'] = " ".join(pg_options)
+
+            engine_kwargs = {
+                'pool_pre_ping': pool_pre_ping, # Descarta conexões mortas (restart do PG, firewall) no checkout
+                'query_cache_size': query_cache_size, # Cache de SQL compilado por engine
+                'insertmanyvalues_page_size': insertmanyvalues_page_size, # Linhas por INSERT em lote
+            }
+            pool_cls = None
+            if poolclass:
+                pool_cls = getattr(sqlalchemy_pool, poolclass, None)
+                if not (isinstance(pool_cls, type) and issubclass(pool_cls, sqlalchemy_pool.Pool)):
+                    raise ConfigurationError(f"Invalid SQLAlchemy pool class: '{poolclass}'.")
+                engine_kwargs['poolclass'] = pool_cls
+            # Sem poolclass: o padrão do dialeto (QueuePool; SingletonThreadPool p/ SQLite em memória)
+            effective_pool_cls = pool_cls or url.get_dialect().get_pool_class(url)
+            pooled = issubclass(effective_pool_cls, sqlalchemy_pool.QueuePool)
+            if pooled:
+                # Só QueuePool aceita estes parâmetros (NullPool/StaticPool/SingletonThreadPool/
+                # AssertionPool recusam com TypeError no create_engine)
+                engine_kwargs.update(
+                    pool_size=pool_size, max_overflow=max_overflow, pool_use_lifo=pool_use_lifo, pool_recycle=pool_recycle
+                )
+
             engine = create_engine(
-                database_uri,
-                pool_size=pool_size,
-                max_overflow=max_overflow,
-                pool_recycle=3600,
-                echo=False
+                url,
+                connect_args=connect_args,
+                echo=echo,
+                echo_pool=echo_pool,
+                **engine_kwargs
             )
+            if url.get_backend_name() == 'sqlite':
+                _register_sqlite_pragmas(engine)
+            if slow_query_ms and slow_query_ms > 0:
+                _register_slow_query_log(engine, slow_query_ms)
+            logger.info("SQLAlchemy pool: %s (size=%s, max_overflow=%s, recycle=%ss, pre_ping=%s, lifo=%s)",
+                        type(engine.pool).__name__, pool_size if pooled else 0, max_overflow if pooled else 0,
+                        pool_recycle if pooled else 0, pool_pre_ping, pool_use_lifo and pooled)
 
-            # 2. Test Connection
-            try:
-                with engine.connect() as connection:
+            # 2. Test Connection (opcional: o SchemaManager abaixo já conecta de forma
+            # síncrona, então o teste dedicado só custa um round-trip extra no startup)
+            if startup_probe:
+                try:
+                    # Conexão DB-API crua: só o SELECT 1, sem BEGIN/ROLLBACK do Connection;
+                    # close() devolve a conexão (já aquecida) ao pool
+                    raw = engine.raw_connection()
+                    try:
+                        cursor = raw.cursor()
+                        cursor.execute("SELECT 1")
+                        cursor.fetchone()
+                        cursor.close()
+                    finally:
+                        raw.close()
                     logger.info("Database connection successful.")
-            except SQLAlchemyError as conn_err:
-                logger.critical(f"Database connection failed: {conn_err}", exc_info=True)
-                raise DatabaseError(f"Failed to connect to the database: {conn_err}") from conn_err
+                except (SQLAlchemyError, engine.dialect.loaded_dbapi.Error) as conn_err:
+                    logger.critical("Database connection failed: %s", conn_err, exc_info=True)
+                    raise DatabaseError(f"Failed to connect to the database: {conn_err}") from conn_err
 
             # 3. Create Session Factory (SessionLocal)
-            _SessionLocalFactory = sessionmaker(
-                autocommit=False, autoflush=False, bind=engine, expire_on_commit=False
-            )
+            # expire_on_commit=False: objetos continuam legíveis depois do commit/remove()
+            # de get_db_session (sem DetachedInstanceError nem SELECT de refresh)
+            _SessionLocalFactory = sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+            _ScopedSession = scoped_session(_SessionLocalFactory)
             logger.info("SQLAlchemy session factory (SessionLocal) created.")
 
             # 4. Initialize Schema (uses the engine)
-            # --- Importar SchemaManager localmente ---
-            from .schema_manager import SchemaManager
-            # ---------------------------------------
-            try:
-                logger.info("Initializing database schema...")
-                schema_manager = SchemaManager(engine)
-                schema_manager.initialize_schema()
-                logger.info("Database schema initialization complete.")
-            except Exception as schema_err:
-                logger.critical(f"Database schema initialization failed: {schema_err}", exc_info=True)
-                engine.dispose()
-                raise DatabaseError(f"Schema initialization failed: {schema_err}") from schema_err
+            if run_schema_init:
+                # --- Importar SchemaManager localmente ---
+                from .schema_manager import SchemaManager
+                # ---------------------------------------
+                try:
+                    logger.info("Initializing database schema...")
+                    schema_manager = SchemaManager(engine)
+                    schema_manager.initialize_schema()
+                    logger.info("Database schema initialization complete.")
+                except Exception as schema_err:
+                    logger.critical("Database schema initialization failed: %s", schema_err, exc_info=True)
+                    engine.dispose()
+                    raise DatabaseError(f"Schema initialization failed: {schema_err}") from schema_err
+            else:
+                logger.info("Database schema initialization skipped (schema managed by Alembic).")
 
             # Store the initialized engine
             _sqla_engine = engine
             logger.info("SQLAlchemy initialization complete.")
+
+            # Aquecimento do pool em background: abre as conexões restantes e as devolve
+            # ao pool já estabelecidas (handshake feito), sem bloquear o create_app.
+            # Só depois do engine publicado: uma falha acima nunca deixa a thread
+            # abrindo conexões num engine descartado.
+            if pooled:
+                warmup = pool_size if warmup_connections is None else max(1, min(warmup_connections, pool_size))
+                if warmup > 1:
+                    threading.Thread(
+                        target=_warm_up_pool, args=(engine, warmup), name="sqla-pool-warmup", daemon=True
+                    ).start()
             return _sqla_engine
 
         except (DatabaseError, ConfigurationError) as e: # Capturar config error tb
@@ -94,75 +227,227 @@ def init_sqlalchemy(database_uri: str, pool_size: int = 10, max_overflow: int =
         except SQLAlchemyError as e:
              # Logger pode não estar disponível
              print(f"ERROR: SQLAlchemy error during initialization: {e}")
-             logger.critical(f"SQLAlchemy engine/session factory initialization failed: {e}", exc_info=True)
+             logger.critical("SQLAlchemy engine/session factory initialization failed: %s", e, exc_info=True)
              raise DatabaseError(f"SQLAlchemy initialization failed: {e}") from e
         except Exception as e:
              # Logger pode não estar disponível
              print(f"ERROR: Unexpected error during SQLAlchemy initialization: {e}")
-             logger.critical(f"Unexpected error during SQLAlchemy initialization: {e}", exc_info=True)
+             logger.critical("Unexpected error during SQLAlchemy initialization: %s", e, exc_info=True)
              if 'engine' in locals() and engine: engine.dispose()
              raise DatabaseError(f"Unexpected error during database initialization: {e}") from e
 
+def _register_slow_query_log(engine: Engine, threshold_ms: int) -> None:
+    """Logs (WARNING) every statement on 'engine' that takes longer than 'threshold_ms'."""
+    threshold_s = threshold_ms / 1000.0
+
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_start_time', []).append(time.perf_counter())
+
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info['query_start_time'].pop()
+        if elapsed > threshold_s: # Formata/loga apenas as queries lentas
+            _logger.warning("Slow query (%.1f ms): %s", elapsed * 1000, statement)
+
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    _logger.info("SQLAlchemy slow query log enabled (threshold: %s ms).", threshold_ms)
+
+# WAL: leitores não bloqueiam o escritor; NORMAL: fsync só no checkpoint (seguro com WAL)
+_SQLITE_PRAGMAS = (
+    "PRAGMA foreign_keys=ON", # SQLite só aplica FKs (e ON DELETE CASCADE) com este PRAGMA
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+)
+
+def _register_sqlite_pragmas(engine: Engine) -> None:
+    """Applies the SQLite performance PRAGMAs once per new DB-API connection of 'engine'."""
+    def _on_connect(dbapi_connection, connection_record):
+        # sqlite3.Connection.execute usa um cursor implícito (sem cursor()/close() explícitos)
+        for pragma in _SQLITE_PRAGMAS:
+            dbapi_connection.execute(pragma)
+
+    event.listen(engine, "connect", _on_connect)
+    _logger.info("SQLite PRAGMAs enabled: %s.", ", ".join(p.split(' ', 1)[1] for p in _SQLITE_PRAGMAS))
+
+def _warm_up_pool(engine: Engine, count: int) -> None:
+    """
+    Opens 'count' connections at once and returns them to the pool (best effort).
+    Stops as soon as 'engine' is no longer the published engine (disposed/replaced).
+    """
+    logger = _logger # Já carregado por init_sqlalchemy
+
+    connections = []
+    try:
+        for _ in range(count):
+            if _sqla_engine is not engine: # dispose_sqlalchemy_engine() rodou: não abre mais nada
+                break
+            connections.append(engine.connect())
+    except Exception as e:
+        logger.warning("SQLAlchemy pool warm-up stopped after %d connection(s): %s", len(connections), e)
+    finally:
+        disposed = _sqla_engine is not engine
+        for connection in connections:
+            if disposed:
+                connection.invalidate() # Fecha a conexão DB-API em vez de devolvê-la ao pool descartado
+            connection.close()
+    if disposed:
+        logger.info("SQLAlchemy pool warm-up aborted: engine was disposed.")
+    else:
+        logger.info("SQLAlchemy pool warmed up with %d connection(s).", len(connections))
+
 # --- Função para Obter uma Sessão (Gerenciador de Contexto) ---
-@contextmanager
-def get_db_session() -> Generator[Session, None, None]:
+class _DbSessionContext:
+    """
+    Context manager returned by get_db_session(). A plain class instead of a
+    @contextmanager generator: no generator/wrapper allocation per session.
+    """
+    __slots__ = ('db', 'readonly', 'scoped')
+
+    def __init__(self, readonly: bool = False):
+        self.db: Optional[Session] = None
+        self.readonly = readonly
+        self.scoped: Optional[scoped_session[Session]] = None # Registro de onde veio self.db
+
+    def __enter__(self) -> Session:
+        if _SessionLocalFactory is None:
+            # Logger pode não estar disponível aqui se a inicialização falhou muito cedo
+            # logger.critical("SessionLocal factory not initialized. Call init_sqlalchemy() first.")
+            print("CRITICAL ERROR: Database session factory has not been initialized.")
+            raise RuntimeError("Database session factory has not been initialized.")
+        scoped = _ScopedSession
+        if scoped is not None and not scoped.registry.has():
+            # Caso comum: sessão da thread vinda do registro do scoped_session
+            self.db = scoped()
+            self.scoped = scoped
+        else:
+            # get_db_session aninhado na mesma thread: sessão independente, para que o
+            # commit/close do bloco interno não afete o externo
+            self.db = _SessionLocalFactory()
+        return self.db
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> bool:
+        # Factory existe => init_sqlalchemy já carregou as dependências (sem import por sessão)
+        logger = _logger
+        db = self.db
+        try:
+            if exc_type is None:
+                if self.readonly:
+                    # Sem flush/COMMIT: close() abaixo devolve a conexão e o pool encerra a transação
+                    return False
+                try:
+                    db.commit()
+                    return False
+                except SQLAlchemyError as commit_ex:
+                    exc_type, exc_val = type(commit_ex), commit_ex
+            if not issubclass(exc_type, Exception):
+                return False # KeyboardInterrupt/SystemExit etc.: apenas fecha a sessão
+
+            if issubclass(exc_type, SQLAlchemyError):
+                logger.error("Database error occurred in session: %s", exc_val, exc_info=(exc_type, exc_val, exc_val.__traceback__))
+                db.rollback()
+                logger.warning("Database session rolled back due to SQLAlchemyError.")
+                raise _DatabaseError(f"Database operation failed: {exc_val}") from exc_val
+
+            logger.error("Error occurred in database session: %s", exc_val, exc_info=(exc_type, exc_val, exc_tb))
+            db.rollback()
+            logger.warning("Database session rolled back due to exception.")
+            return False # Propaga a exceção original
+        finally:
+            if self.scoped is not None:
+                self.scoped.remove() # Fecha a sessão e libera o registro da thread
+            else:
+                db.close()
+            self.db = self.scoped = None
+
+def get_db_session(readonly: bool = False) -> _DbSessionContext:
     """
     Dependency function/context manager to get a database session.
     Manages session lifecycle (commit, rollback, close).
-    Uses local imports for logger/errors.
+    Logger/errors are imported lazily (see _load_deps).
+
+    With readonly=True a clean exit skips flush/commit and just closes the
+    session (pending changes are discarded). Loaded objects stay usable after
+    the block, as with a commit (expire_on_commit=False).
+
+    Usage: with get_db_session() as db: ...
+    """
+    return _DbSessionContext(readonly)
+
+# --- Sessão por Requisição (lazy, vinculada ao flask.g) ---
+def get_db() -> Session:
+    """
+    Returns the database session bound to the current Flask request,
+    creating it on first use. Endpoints that never call this never check out
+    a connection. The session is closed by close_request_db() on teardown;
+    callers that write must commit explicitly.
     """
-    # --- Importações locais ---
-    from src.utils.logger import logger # Importa logger aqui
-    from src.api.errors import DatabaseError # Importa errors aqui
-    # -------------------------
-
-    if not _SessionLocalFactory:
-        # Logger pode não estar disponível aqui se a inicialização falhou muito cedo
-        # logger.critical("SessionLocal factory not initialized. Call init_sqlalchemy() first.")
-        print("CRITICAL ERROR: Database session factory has not been initialized.")
-        raise RuntimeError("Database session factory has not been initialized.")
-
-    db: Optional[Session] = None
+    from flask import g # Importação local: Alembic não depende do Flask
+
+    db = g.get('_db')
+    if db is None:
+        if _SessionLocalFactory is None:
+            raise RuntimeError("Database session factory has not been initialized.")
+        db = g._db = _SessionLocalFactory()
+    return db
+
+def close_request_db(exc: Optional[BaseException] = None) -> None:
+    """
+    Teardown hook for get_db(): rolls back on unhandled errors and closes
+    the request session, if one was opened. Uncommitted work is discarded.
+    """
+    from flask import g
+
+    db = g.pop('_db', None)
+    if db is None:
+        return
     try:
-        db = _SessionLocalFactory()
-        yield db
-        db.commit()
-        logger.debug("Database session committed successfully.")
-    except SQLAlchemyError as sql_ex:
-        logger.error(f"Database error occurred in session: {sql_ex}", exc_info=True)
-        if db:
+        if exc is not None:
             db.rollback()
-            logger.warning("Database session rolled back due to SQLAlchemyError.")
-        raise DatabaseError(f"Database operation failed: {sql_ex}") from sql_ex
-    except Exception as e:
-        logger.error(f"Error occurred in database session: {e}", exc_info=True)
-        if db:
-            db.rollback()
-            logger.warning("Database session rolled back due to exception.")
-        raise
     finally:
-        if db:
-            db.close()
-            logger.debug("Database session closed.")
+        db.close()
+
+# --- Fábricas de Repositórios (cacheadas por engine) ---
+# Repositórios são wrappers sem estado em torno do engine: uma instância por
+# engine basta, mesmo com várias chamadas ao create_app (ex: suíte de testes).
+@functools.cache
+def get_user_repository(engine: Engine):
+    """Returns the (cached) UserRepository for the given engine."""
+    from .user_repository import UserRepository # Importação local (Alembic)
+    return UserRepository(engine)
+
+@functools.cache
+def get_observation_repository(engine: Engine):
+    """Returns the (cached) ObservationRepository for the given engine."""
+    from .observation_repository import ObservationRepository
+    return ObservationRepository(engine)
 
 # --- Função de Desligamento do Engine ---
 def dispose_sqlalchemy_engine():
     """Closes all connections in the engine's pool. Call during application shutdown."""
-    # --- Importações locais ---
-    from src.utils.logger import logger # Importa logger aqui
-    # -------------------------
+    _load_deps()
+    logger = _logger
+
+    global _sqla_engine, _SessionLocalFactory, _ScopedSession
+    if _sqla_engine is None: # Caminho rápido sem lock (nada a descartar)
+        logger.debug("SQLAlchemy engine shutdown called, but engine already disposed or not initialized.")
+        return
 
-    global _sqla_engine, _SessionLocalFactory
     with _engine_lock:
-        if _sqla_engine:
+        if _sqla_engine is not None:
             logger.info("Disposing SQLAlchemy engine connection pool...")
             try:
                 _sqla_engine.dispose()
                 _sqla_engine = None
                 _SessionLocalFactory = None
+                _ScopedSession = None
+                # Repositórios cacheados referenciam o engine descartado
+                get_user_repository.cache_clear()
+                get_observation_repository.cache_clear()
                 logger.info("SQLAlchemy engine connection pool disposed.")
             except Exception as e:
-                logger.error(f"Error disposing SQLAlchemy engine pool: {e}", exc_info=True)
+                logger.error("Error disposing SQLAlchemy engine pool: %s", e, exc_info=True)
         else:
             logger.debug("SQLAlchemy engine shutdown called, but engine already disposed or not initialized.")
 
@@ -171,6 +456,10 @@ def dispose_sqlalchemy_engine():
 __all__ = [
     "init_sqlalchemy",
     "get_db_session",
+    "get_db",
+    "close_request_db",
+    "get_user_repository",
+    "get_observation_repository",
     "dispose_sqlalchemy_engine",
     "Base", # Essencial
 ]
\ No newline at end of file
@@ -28,7 +28,7 @@ class BaseRepository:
         # Criar a fábrica de sessões localmente se não for injetada globalmente?
         # Por simplicidade, vamos assumir que os repositórios filhos obterão
         # a sessão via get_db_session() ou injeção.
-        logger.debug(f"{self.__class__.__name__} initialized with SQLAlchemy engine: {engine.url.database}")
+        logger.debug("%s initialized with SQLAlchemy engine: %s", self.__class__.__name__, engine.url.database)
 
     # Métodos _execute e _execute_transaction foram removidos.
     # Os repositórios filhos usarão a API da Sessão SQLAlchemy diretamente.
@@ -29,7 +29,7 @@ class ObservationRepository(BaseRepository):
         if not observation.reference_code or not observation.observation_text or not observation.user:
              raise ValueError("Missing required fields (reference_code, observation_text, user).")
 
-        logger.debug(f"ORM: Adding observation for ref '{observation.reference_code}' to session")
+        logger.debug("ORM: Adding observation for ref '%s' to session", observation.reference_code)
         try:
             # Define timestamp se não estiver definido
             if observation.timestamp is None:
@@ -55,13 +55,13 @@ class ObservationRepository(BaseRepository):
 
     def find_by_id(self, db: Session, observation_id: int) -> Optional[Observation]:
         """Finds an observation by its ID using ORM Session."""
-        logger.debug(f"ORM: Finding observation by ID {observation_id}")
+        logger.debug("ORM: Finding observation by ID %s", observation_id)
         try:
             observation = db.get(Observation, observation_id)
             if observation:
-                 logger.debug(f"ORM: Observation found by ID {observation_id}.")
+                 logger.debug("ORM: Observation found by ID %s.", observation_id)
             else:
-                 logger.debug(f"ORM: Observation not found by ID {observation_id}.")
+                 logger.debug("ORM: Observation not found by ID %s.", observation_id)
             return observation
         except SQLAlchemyError as e:
              logger.error(f"ORM: Database error finding observation by ID {observation_id}: {e}", exc_info=True)
@@ -73,7 +73,7 @@ class ObservationRepository(BaseRepository):
 
     def find_by_reference_code(self, db: Session, reference_code: str, include_resolved: bool = True) -> List[Observation]:
         """Finds observations for a reference code using ORM Session."""
-        logger.debug(f"ORM: Finding obs for ref '{reference_code}' (resolved={include_resolved})")
+        logger.debug("ORM: Finding obs for ref '%s' (resolved=%s)", reference_code, include_resolved)
         try:
             stmt = select(Observation).where(Observation.reference_code == reference_code)
             if not include_resolved:
@@ -81,7 +81,7 @@ class ObservationRepository(BaseRepository):
             stmt = stmt.order_by(Observation.timestamp.desc())
 
             observations = db.scalars(stmt).all()
-            logger.debug(f"ORM: Found {len(observations)} obs for ref '{reference_code}'.")
+            logger.debug("ORM: Found %d obs for ref '%s'.", len(observations), reference_code)
             return list(observations)
         except SQLAlchemyError as e:
              logger.error(f"ORM: Database error finding obs by ref '{reference_code}': {e}", exc_info=True)
@@ -95,7 +95,7 @@ class ObservationRepository(BaseRepository):
         if observation_to_update.id is None:
             raise ValueError("Cannot update observation without an ID.")
 
-        logger.debug(f"ORM: Updating observation ID {observation_to_update.id} in session")
+        logger.debug("ORM: Updating observation ID %s in session", observation_to_update.id)
         try:
             # Se o objeto veio de fora da sessão, buscar primeiro ou usar merge.
             # Assumindo que o objeto já está na sessão ou será gerenciado pelo chamador.
@@ -115,7 +115,7 @@ class ObservationRepository(BaseRepository):
 
     def mark_as_resolved(self, db: Session, observation_id: int, resolved_by_user: str) -> bool:
         """Marks a specific observation as resolved using ORM Session."""
-        logger.debug(f"ORM: Marking observation ID {observation_id} as resolved by '{resolved_by_user}'")
+        logger.debug("ORM: Marking observation ID %s as resolved by '%s'", observation_id, resolved_by_user)
         try:
             observation = db.get(Observation, observation_id)
             if not observation:
@@ -146,7 +146,7 @@ class ObservationRepository(BaseRepository):
 
     def get_unresolved_count(self, db: Session, reference_code: str) -> int:
         """Gets the count of unresolved observations using ORM Session."""
-        logger.debug(f"ORM: Getting unresolved count for ref '{reference_code}'")
+        logger.debug("ORM: Getting unresolved count for ref '%s'", reference_code)
         try:
             stmt = (
                 select(func.count(Observation.id))
@@ -155,7 +155,7 @@ class ObservationRepository(BaseRepository):
             )
             count = db.scalar(stmt)
             count = count if count is not None else 0
-            logger.debug(f"ORM: Unresolved count for ref '{reference_code}': {count}")
+            logger.debug("ORM: Unresolved count for ref '%s': %s", reference_code, count)
             return count
         except SQLAlchemyError as e:
             logger.error(f"ORM: Failed get unresolved count for ref '{reference_code}': {e}", exc_info=True)
@@ -193,18 +193,19 @@ class ObservationRepository(BaseRepository):
                 .order_by(Observation.timestamp.desc())
             )
 
-            results = db.execute(stmt).mappings().all() # Executa e pega como dicionários
+            # Linhas como tuplas (sem a camada .mappings()): colunas desempacotadas na ordem do select
+            results = db.execute(stmt)
 
             # Formata o resultado (converte datetime para isoformat)
             formatted_results = [
                  {
-                      "reference_code": row["reference_code"],
-                      "user": row["user"],
-                      "timestamp": row["timestamp"].isoformat() if isinstance(row["timestamp"], datetime) else None
-                 } for row in results
+                      "reference_code": reference_code,
+                      "user": user,
+                      "timestamp": timestamp.isoformat() if isinstance(timestamp, datetime) else None
+                 } for reference_code, user, timestamp in results
             ]
 
-            logger.debug(f"ORM: Found {len(formatted_results)} references with pending observations.")
+            logger.debug("ORM: Found %d references with pending observations.", len(formatted_results))
             return formatted_results
         except SQLAlchemyError as e:
             logger.error(f"ORM: Failed to get references with pending observations: {e}", exc_info=True)
@@ -215,7 +216,7 @@ class ObservationRepository(BaseRepository):
 
     def delete_by_id(self, db: Session, observation_id: int) -> bool:
         """Deletes an observation by its ID using ORM Session."""
-        logger.debug(f"ORM: Deleting observation ID {observation_id}")
+        logger.debug("ORM: Deleting observation ID %s", observation_id)
         try:
             observation = db.get(Observation, observation_id)
             if observation:
@@ -1,15 +1,16 @@
 # src/database/schema_manager.py
 # Manages the initial creation of database tables and essential data.
 
-import bcrypt
 import os
 from datetime import datetime, timezone
+from typing import Optional
 from sqlalchemy.engine import Engine, Connection
 from sqlalchemy.exc import SQLAlchemyError, IntegrityError
 from sqlalchemy import text, inspect
 
 # Importar Base para usar metadata
 from .base import Base
+from src.domain.user import hash_password
 from src.utils.logger import logger
 from src.api.errors import DatabaseError, ConfigurationError
 
@@ -61,9 +62,15 @@ class SchemaManager:
             logger.info("Starting database schema initialization...")
 
             # --- Create Tables using ORM Metadata ---
-            logger.debug("Creating tables based on ORM metadata if they don't exist...")
-            Base.metadata.create_all(bind=self.engine)
-            logger.info("ORM tables checked/created successfully (if they didn't exist).")
+            # Banco já versionado pelo Alembic: as tabelas existem e o create_all (que
+            # inspeciona cada tabela no catálogo) é pulado. Uma única query decide.
+            alembic_revision = self._get_alembic_revision()
+            if alembic_revision:
+                logger.info(f"Database managed by Alembic (revision {alembic_revision}). Skipping ORM create_all.")
+            else:
+                logger.debug("Creating tables based on ORM metadata if they don't exist...")
+                Base.metadata.create_all(bind=self.engine)
+                logger.info("ORM tables checked/created successfully (if they didn't exist).")
 
             # --- Ensure Admin User ---
             with self.engine.connect() as connection:
@@ -82,6 +89,17 @@ class SchemaManager:
             raise DatabaseError(f"Schema initialization failed: {e}") from e
 
 
+    def _get_alembic_revision(self) -> Optional[str]:
+        """
+        Returns the revision stored in 'alembic_version', or None if the table doesn't
+        exist/is empty (database never migrated by Alembic).
+        """
+        try:
+            with self.engine.connect() as connection:
+                return connection.execute(text("SELECT version_num FROM alembic_version")).scalar()
+        except SQLAlchemyError:
+            return None # Tabela inexistente: o schema ainda não é gerenciado pelo Alembic
+
     def _ensure_admin_user_exists(self, connection: Connection):
         """Checks for the default admin user and creates it if missing using direct SQL."""
         # Esta lógica permanece a mesma, pois é para dados essenciais.
@@ -96,7 +114,7 @@ class SchemaManager:
             if not admin_user_row:
                 logger.info("Default admin user not found. Creating...")
                 password = DEFAULT_ADMIN_PASSWORD
-                hashed_password = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+                hashed_password = hash_password(password)
                 now_utc = datetime.now(timezone.utc)
 
                 # Inserir usuário com RETURNING id
@@ -2,13 +2,14 @@
 # Handles database operations related to Users and UserPermissions using SQLAlchemy ORM.
 
 from datetime import datetime, timezone
-from typing import List, Optional, Dict, Any
-from sqlalchemy import select, func, delete, update # Import select, func, delete, update
+from typing import List, Optional, Dict, Any, Iterator, Set
+from sqlalchemy import select, func, delete, update, or_ # Import select, func, delete, update, or_
 from sqlalchemy.orm import Session, joinedload, selectinload # Import Session, joinedload, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 
 from .base_repository import BaseRepository
-from src.domain.user import User, UserPermissions # Import ORM models
+from src.domain.user import User, UserPermissions, UserDTO, UserPermissionsDTO # Import ORM models / DTOs
 from src.utils.logger import logger
 from src.api.errors import DatabaseError, NotFoundError, ValidationError # Import custom errors
 
@@ -29,7 +30,7 @@ class UserRepository(BaseRepository):
         """
         Finds an active user by their username (case-insensitive) using ORM Session.
         """
-        logger.debug(f"ORM: Finding active user by username '{username}'")
+        logger.debug("ORM: Finding active user by username '%s'", username)
         try:
             # Usar select e options para carregar relacionamento
             stmt = (
@@ -41,9 +42,9 @@ class UserRepository(BaseRepository):
             user = db.scalars(stmt).first() # Pega o primeiro resultado ou None
 
             if user:
-                logger.debug(f"ORM: User found by username '{username}': ID {user.id}")
+                logger.debug("ORM: User found by username '%s': ID %s", username, user.id)
             else:
-                logger.debug(f"ORM: Active user not found by username '{username}'.")
+                logger.debug("ORM: Active user not found by username '%s'.", username)
             return user
         except SQLAlchemyError as e:
             logger.error(f"ORM: Database error finding user by username '{username}': {e}", exc_info=True)
@@ -54,18 +55,18 @@ class UserRepository(BaseRepository):
 
     def find_by_id(self, db: Session, user_id: int) -> Optional[User]:
         """Finds a user by their ID using ORM Session (regardless of active status)."""
-        logger.debug(f"ORM: Finding user by ID {user_id}")
+        logger.debug("ORM: Finding user by ID %s", user_id)
         try:
             # session.get é otimizado para busca por PK
             # Usar options para carregar o relacionamento junto
             user = db.get(User, user_id, options=[joinedload(User.permissions)])
             if user:
-                 logger.debug(f"ORM: User found by ID {user_id}.")
+                 logger.debug("ORM: User found by ID %s.", user_id)
                  # Se permissions for None após joinedload, pode indicar inconsistência
                  if user.permissions is None:
                       logger.warning(f"ORM: User ID {user_id} found, but permissions relationship is None. Data inconsistency?")
             else:
-                 logger.debug(f"ORM: User not found by ID {user_id}.")
+                 logger.debug("ORM: User not found by ID %s.", user_id)
             return user
         except SQLAlchemyError as e:
             logger.error(f"ORM: Database error finding user by ID {user_id}: {e}", exc_info=True)
@@ -78,9 +79,11 @@ class UserRepository(BaseRepository):
         """Retrieves all users from the database using ORM Session."""
         logger.debug("ORM: Retrieving all users")
         try:
+            # Eager load explícito: uma única query traz usuários + permissões
+            # (sem isso, o to_dict() de cada usuário dispararia um SELECT - N+1)
             stmt = select(User).options(joinedload(User.permissions)).order_by(User.username)
             users = db.scalars(stmt).all()
-            logger.debug(f"ORM: Retrieved {len(users)} users from database.")
+            logger.debug("ORM: Retrieved %d users from database.", len(users))
             return list(users) # Converter para lista
         except SQLAlchemyError as e:
              logger.error(f"ORM: Database error retrieving all users: {e}", exc_info=True)
@@ -89,6 +92,69 @@ class UserRepository(BaseRepository):
              logger.error(f"ORM: Unexpected error retrieving all users: {e}", exc_info=True)
              raise DatabaseError(f"Unexpected error retrieving all users: {e}") from e
 
+    @staticmethod
+    def _api_list_select():
+        """Core projection (users LEFT JOIN user_permissions) used by the API listing."""
+        return (
+            select(
+                User.id, User.username, User.name, User.email,
+                User.created_at, User.last_login, User.is_active,
+                UserPermissions.id, UserPermissions.is_admin,
+                UserPermissions.can_access_products, UserPermissions.can_access_fabrics,
+                UserPermissions.can_access_customer_panel, UserPermissions.can_access_fiscal,
+                UserPermissions.can_access_accounts_receivable,
+            )
+            .join(UserPermissions, UserPermissions.user_id == User.id, isouter=True)
+            .order_by(User.username)
+        )
+
+    @staticmethod
+    def _row_to_dto(row) -> UserDTO:
+        (user_id, username, name, email, created_at, last_login, is_active,
+         perm_id, is_admin, can_products, can_fabrics, can_customer_panel,
+         can_fiscal, can_ar) = row
+        return UserDTO(
+            user_id, username, name, email,
+            created_at.isoformat() if created_at else None,
+            last_login.isoformat() if last_login else None,
+            is_active,
+            UserPermissionsDTO(
+                perm_id, user_id, is_admin, can_products, can_fabrics,
+                can_customer_panel, can_fiscal, can_ar,
+            ) if perm_id is not None else None,
+        )
+
+    def list_for_api(self, db: Session) -> List[UserDTO]:
+        """
+        Retrieves all users as UserDTO structs (same shape as User.to_dict(include_hash=False)).
+        Uses a Core column projection (users LEFT JOIN user_permissions), skipping ORM
+        object hydration, identity map and attribute instrumentation for this read-only listing.
+        Encode the result with msgspec.json.encode.
+        """
+        logger.debug("Core: Listing all users for API")
+        try:
+            users = [self._row_to_dto(row) for row in db.execute(self._api_list_select())]
+            logger.debug("Core: Listed %d users.", len(users))
+            return users
+        except SQLAlchemyError as e:
+             logger.error(f"Core: Database error listing users: {e}", exc_info=True)
+             raise DatabaseError(f"Database error listing users: {e}") from e
+
+    def iter_for_api(self, db: Session, yield_per: int = 500) -> Iterator[UserDTO]:
+        """
+        Streaming variant of list_for_api: the query is executed immediately (so
+        connection/SQL errors are raised here, before any response is sent), but rows
+        are fetched from a server-side cursor in batches of 'yield_per' and converted
+        to UserDTO lazily. The session must stay open until the iterator is exhausted.
+        """
+        logger.debug("Core: Streaming all users for API (yield_per=%s)", yield_per)
+        try:
+            result = db.execute(self._api_list_select().execution_options(yield_per=yield_per))
+        except SQLAlchemyError as e:
+             logger.error(f"Core: Database error listing users: {e}", exc_info=True)
+             raise DatabaseError(f"Database error listing users: {e}") from e
+        return (self._row_to_dto(row) for row in result)
+
     def add(self, db: Session, user: User) -> User:
         """Adds a new user and their permissions using ORM Session."""
         if not user.username or not user.password_hash or not user.name:
@@ -101,7 +167,7 @@ class UserRepository(BaseRepository):
              user.permissions = UserPermissions() # Cria permissões padrão associadas
              # O backref/cascade cuidará do user_id ao adicionar o User.
 
-        logger.debug(f"ORM: Adding user '{user.username}' to session")
+        logger.debug("ORM: Adding user '%s' to session", user.username)
         try:
             # Define timestamp se não estiver definido
             if user.created_at is None:
@@ -140,7 +206,7 @@ class UserRepository(BaseRepository):
         if not user_to_update.password_hash: # Validar hash não vazio
              raise ValueError("Password hash cannot be empty for update.")
 
-        logger.debug(f"ORM: Updating user ID {user_to_update.id} in session")
+        logger.debug("ORM: Updating user ID %s in session", user_to_update.id)
         try:
             # O objeto user_to_update já deve estar associado à sessão se foi
             # buscado anteriormente com find_by_id. Se for um objeto novo
@@ -192,9 +258,107 @@ class UserRepository(BaseRepository):
             logger.error(f"ORM: Unexpected error updating user ID {user_to_update.id}: {e}", exc_info=True)
             raise DatabaseError(f"An unexpected error occurred while updating user: {e}") from e
 
+    def update_and_return(self, db: Session, user_id: int,
+                          user_fields: Dict[str, Any], perm_fields: Dict[str, Any]) -> User:
+        """
+        Updates user and permission columns using UPDATE ... RETURNING, so the
+        caller doesn't need a find_by_id before and after the write.
+
+        Args:
+            db: The active Session.
+            user_id: ID of the user to update.
+            user_fields: Column values for 'users' (only the changed ones).
+            perm_fields: Column values for 'user_permissions' (only the changed ones).
+
+        Returns:
+            The updated User (with permissions attached).
+
+        Raises:
+            NotFoundError: If no user exists with the given ID.
+            ValueError: If the new email is already in use.
+        """
+        logger.debug("ORM: Updating user ID %s with RETURNING (user fields: %s, perm fields: %s)", user_id, list(user_fields), list(perm_fields))
+        try:
+            user = None
+            if user_fields:
+                # Só reescreve a linha se algum valor realmente mudou (IS DISTINCT FROM)
+                stmt = (
+                    update(User)
+                    .where(User.id == user_id)
+                    .where(or_(*(getattr(User, col).is_distinct_from(val) for col, val in user_fields.items())))
+                    .values(**user_fields)
+                    .returning(User)
+                )
+                user = db.scalars(stmt).first()
+            if user is None:
+                # Nenhuma linha alterada: usuário inexistente ou valores já iguais (PUT no-op)
+                user = db.get(User, user_id)
+                if user is None:
+                    raise NotFoundError(f"User with ID {user_id} not found.")
+
+            if perm_fields:
+                permissions = self.patch_permissions(db, user_id, perm_fields)
+                # Anexa as permissões retornadas sem disparar um SELECT extra
+                set_committed_value(user, 'permissions', permissions)
+
+            logger.info(f"ORM: User ID {user_id} updated in session. Commit pending.")
+            return user
+        except NotFoundError:
+            raise
+        except IntegrityError as e:
+            db.rollback()
+            logger.warning(f"ORM: Database integrity error updating user ID {user_id}: {e}")
+            error_info = str(e.orig).lower() if e.orig else str(e).lower()
+            if "users_email_key" in error_info or "unique constraint" in error_info and "email" in error_info:
+                 raise ValueError(f"Email '{user_fields.get('email')}' is already in use by another user.")
+            raise DatabaseError(f"Failed to update user due to integrity constraint: {e}") from e
+        except SQLAlchemyError as e:
+            db.rollback()
+            logger.error(f"ORM: Database error updating user ID {user_id}: {e}", exc_info=True)
+            raise DatabaseError(f"Failed to update user: {e}") from e
+        except Exception as e:
+            db.rollback()
+            logger.error(f"ORM: Unexpected error updating user ID {user_id}: {e}", exc_info=True)
+            raise DatabaseError(f"An unexpected error occurred while updating user: {e}") from e
+
+    def patch_permissions(self, db: Session, user_id: int,
+                          perm_updates: Dict[str, Any]) -> Optional[UserPermissions]:
+        """
+        Applies a partial update to a user's permissions row with a single
+        UPDATE ... SET <only the given columns> ... RETURNING. Columns whose
+        value is already the same are not rewritten (IS DISTINCT FROM).
+        Creates the row if it is missing. Errors propagate to the caller,
+        which owns the transaction.
+
+        Returns:
+            The current UserPermissions, or None if perm_updates is empty.
+        """
+        if not perm_updates:
+            return None
+        perm_stmt = (
+            update(UserPermissions)
+            .where(UserPermissions.user_id == user_id)
+            .where(or_(*(getattr(UserPermissions, col).is_distinct_from(val) for col, val in perm_updates.items())))
+            .values(**perm_updates)
+            .returning(UserPermissions)
+        )
+        permissions = db.scalars(perm_stmt).first()
+        if permissions is None:
+            # Nada mudou (ou a linha não existe): carregar a linha atual
+            permissions = db.scalars(
+                select(UserPermissions).where(UserPermissions.user_id == user_id)
+            ).first()
+        if permissions is None:
+            # Usuário sem linha de permissões (inconsistência): cria com os valores enviados
+            logger.warning(f"ORM: User ID {user_id} has no permissions row during update. Creating one.")
+            permissions = UserPermissions(user_id=user_id, **perm_updates)
+            db.add(permissions)
+            db.flush()
+        return permissions
+
     def delete(self, db: Session, user_id: int) -> bool:
         """Deletes a user by their ID using ORM Session."""
-        logger.debug(f"ORM: Deleting user ID {user_id}")
+        logger.debug("ORM: Deleting user ID %s", user_id)
         try:
             user = db.get(User, user_id) # Busca o usuário
             if user:
@@ -214,15 +378,64 @@ class UserRepository(BaseRepository):
             logger.error(f"ORM: Unexpected error deleting user ID {user_id}: {e}", exc_info=True)
             raise DatabaseError(f"An unexpected error occurred while deleting user: {e}") from e
 
+    def delete_returning(self, db: Session, user_id: int) -> bool:
+        """
+        Deletes a user with a single DELETE ... RETURNING id.
+        Permissions are deleted explicitly in the same transaction (the FK's
+        ON DELETE CASCADE is not enforced by every backend, e.g. SQLite).
+
+        Returns:
+            True if the user was deleted, False if no user had the given ID.
+        """
+        logger.debug("ORM: Deleting user ID %s (DELETE ... RETURNING)", user_id)
+        try:
+            # Permissões primeiro: não depende do ON DELETE CASCADE do banco
+            db.execute(delete(UserPermissions).where(UserPermissions.user_id == user_id),
+                       execution_options={"synchronize_session": False})
+            stmt = delete(User).where(User.id == user_id).returning(User.id)
+            deleted_id = db.execute(stmt, execution_options={"synchronize_session": False}).scalar_one_or_none()
+            if deleted_id is None:
+                logger.warning(f"ORM: Attempted to delete user ID {user_id}, but user was not found.")
+                return False
+            logger.info(f"ORM: User ID {user_id} deleted in session. Commit pending.")
+            return True
+        except SQLAlchemyError as e:
+            db.rollback()
+            logger.error(f"ORM: Database error deleting user ID {user_id}: {e}", exc_info=True)
+            raise DatabaseError(f"Failed to delete user: {e}") from e
+
+    def delete_many(self, db: Session, user_ids: List[int]) -> Set[int]:
+        """
+        Deletes several users with a single DELETE ... WHERE id IN (...) RETURNING id.
+        Permissions are deleted explicitly in the same transaction (see delete_returning).
+
+        Returns:
+            The set of IDs that were actually deleted.
+        """
+        if not user_ids:
+            return set()
+        logger.debug("ORM: Bulk deleting %d user ID(s) (DELETE ... RETURNING)", len(user_ids))
+        try:
+            db.execute(delete(UserPermissions).where(UserPermissions.user_id.in_(user_ids)),
+                       execution_options={"synchronize_session": False})
+            stmt = delete(User).where(User.id.in_(user_ids)).returning(User.id)
+            deleted_ids = set(db.execute(stmt, execution_options={"synchronize_session": False}).scalars())
+            logger.info(f"ORM: {len(deleted_ids)} user(s) deleted in session. Commit pending.")
+            return deleted_ids
+        except SQLAlchemyError as e:
+            db.rollback()
+            logger.error(f"ORM: Database error bulk deleting users: {e}", exc_info=True)
+            raise DatabaseError(f"Failed to delete users: {e}") from e
+
     def update_last_login(self, db: Session, user_id: int) -> bool:
         """Updates the last_login timestamp for a user using ORM Session."""
-        logger.debug(f"ORM: Updating last_login for user ID {user_id}")
+        logger.debug("ORM: Updating last_login for user ID %s", user_id)
         try:
             user = db.get(User, user_id)
             if user:
                 user.last_login = datetime.now(timezone.utc)
                 db.flush() # Opcional
-                logger.debug(f"ORM: User ID {user_id} last_login marked for update. Commit pending.")
+                logger.debug("ORM: User ID %s last_login marked for update. Commit pending.", user_id)
                 return True
             else:
                  logger.warning(f"ORM: Failed to update last_login for user ID {user_id} (user not found).")
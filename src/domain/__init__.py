@@ -2,7 +2,7 @@
 # Makes 'domain' a package. Exports domain models.
 
 # ORM Models (já convertidos ou serão nos próximos passos)
-from .user import User, UserPermissions
+from .user import User, UserPermissions, UserDTO, UserPermissionsDTO, CreateUserPayload, UpdateUserPayload, BulkDeleteUsersPayload
 from .observation import Observation
 
 # Dataclasses (ainda não convertidos para ORM, se aplicável)
@@ -25,7 +25,8 @@ from .accounts_receivable import (
 # pode ser removido daqui. No entanto, é seguro manter todos.
 __all__ = [
     # ORM Models
-    "User", "UserPermissions",
+    "User", "UserPermissions", "UserDTO", "UserPermissionsDTO",
+    "CreateUserPayload", "UpdateUserPayload", "BulkDeleteUsersPayload",
     "Observation",
 
     # Dataclasses (Potencialmente a serem convertidos ou usados como DTOs)
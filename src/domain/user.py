@@ -3,9 +3,13 @@
 
 from datetime import datetime, timezone
 import bcrypt
-from typing import Optional, Dict, Any, TYPE_CHECKING # Import TYPE_CHECKING
+from argon2 import PasswordHasher
+from argon2.exceptions import VerificationError
+from typing import Optional, Dict, Any, List, Union, Annotated, TYPE_CHECKING # Import TYPE_CHECKING
+import msgspec
+from msgspec import UNSET, UnsetType
 from sqlalchemy import (
-    Column, Integer, String, Boolean, DateTime, ForeignKey, func, Text
+    Column, Integer, String, Boolean, DateTime, ForeignKey, func, Text, Index
 )
 from sqlalchemy.orm import relationship, Mapped, mapped_column # ORM imports
 from sqlalchemy.dialects.postgresql import TIMESTAMP # Especificar timezone para PG
@@ -19,6 +23,30 @@ from src.utils.logger import logger
 if TYPE_CHECKING:
     pass # Não há necessidade imediata aqui, mas é bom padrão
 
+# Hasher argon2id (implementação em C via argon2-cffi). Hashes bcrypt antigos
+# continuam sendo verificados; novos hashes/trocas de senha usam argon2id.
+_password_hasher = PasswordHasher(time_cost=2, memory_cost=65536, parallelism=2)
+_ARGON2_PREFIX = '$argon2'
+
+def hash_password(password: str) -> str:
+    """Returns the argon2id hash (str) for the given plain-text password."""
+    return _password_hasher.hash(password)
+
+def check_password_hash(password: str, password_hash: str) -> bool:
+    """
+    Verifies a plain-text password against a stored hash.
+    Supports argon2id hashes and legacy bcrypt hashes.
+
+    Raises:
+        ValueError: If the stored hash is not a valid argon2/bcrypt hash.
+    """
+    if password_hash.startswith(_ARGON2_PREFIX):
+        try:
+            return _password_hasher.verify(password_hash, password)
+        except VerificationError:
+            return False
+    return bcrypt.checkpw(password.encode('utf-8'), password_hash.encode('utf-8'))
+
 # UserPermissions agora é um modelo ORM
 class UserPermissions(Base):
     """
@@ -92,8 +120,9 @@ class User(Base):
         back_populates="user",
         cascade="all, delete-orphan",
         uselist=False, # Importante para um-para-um
-        lazy="joined" # Carrega permissões junto com o usuário (bom para poucos dados)
-                      # Alternativas: 'select' (query separada), 'subquery', 'raise'
+        lazy="select" # Padrão: query separada sob demanda. O eager loading é
+                      # decidido em cada query do repositório (joinedload em
+                      # get_all/find_by_id/find_by_username), evitando N+1 na listagem.
     )
 
     # --- Métodos de Lógica (permanecem os mesmos) ---
@@ -105,9 +134,7 @@ class User(Base):
             logger.warning(f"Tentativa de definir senha vazia para usuário {self.username}")
             return
         try:
-            salt = bcrypt.gensalt()
-            hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
-            self.password_hash = hashed.decode('utf-8')
+            self.password_hash = hash_password(password)
         except Exception as e:
             logger.error(f"Error hashing password for user {self.username}: {e}")
             self.password_hash = "" # Reset em caso de erro
@@ -118,13 +145,11 @@ class User(Base):
             logger.debug(f"Password verification failed for user {self.username}: Missing hash or provided password.")
             return False
         try:
-            # Garantir que o hash seja codificado para bytes
-            hash_bytes = self.password_hash.encode('utf-8')
-            result = bcrypt.checkpw(password.encode('utf-8'), hash_bytes)
+            result = check_password_hash(password, self.password_hash)
             logger.debug(f"Password verification result for user {self.username}: {result}")
             return result
         except ValueError as e:
-             # Isso pode acontecer se o hash armazenado não for válido para bcrypt
+             # Isso pode acontecer se o hash armazenado não for válido (argon2/bcrypt)
              logger.error(f"Error verifying password for user {self.username}: {e}. Possible corrupted hash value: '{self.password_hash[:10]}...'")
              return False
         except Exception as e:
@@ -165,4 +190,74 @@ class User(Base):
     def __repr__(self):
         # Usar getattr para segurança, caso permissions não esteja carregado
         perm_id = getattr(self.permissions, 'id', None)
-        return f"<User(id={self.id}, username='{self.username}', perm_id={perm_id})>"
\ No newline at end of file
+        return f"<User(id={self.id}, username='{self.username}', perm_id={perm_id})>"
+
+# Índices de expressão para as buscas case-insensitive (func.lower) do repositório.
+# Declarados aqui para o create_all/autogenerate (migração 7c2e9a4d5f10).
+# Apenas busca (não únicos): a unicidade continua sendo a das colunas (case-sensitive).
+Index('ix_users_username_lower', func.lower(User.username))
+Index('ix_users_email_lower', func.lower(User.email),
+      postgresql_where=User.email.isnot(None))
+
+# --- DTOs de serialização (msgspec) ---
+# Espelham o formato de User.to_dict(include_hash=False). Usados na listagem de
+# usuários, onde a codificação JSON compilada do msgspec substitui o to_dict()
+# linha a linha. Datas ficam como string ISO para manter o mesmo formato de saída.
+# Structs msgspec já são classes com slots; gc=False as tira do rastreamento do
+# coletor de ciclos (só guardam escalares/outros DTOs, sem referências cíclicas).
+# Os modelos ORM não podem usar __slots__: a instrumentação do SQLAlchemy depende
+# do __dict__ da instância.
+class UserPermissionsDTO(msgspec.Struct, gc=False):
+    id: int
+    user_id: int
+    is_admin: bool
+    can_access_products: bool
+    can_access_fabrics: bool
+    can_access_customer_panel: bool
+    can_access_fiscal: bool
+    can_access_accounts_receivable: bool
+
+class UserDTO(msgspec.Struct, gc=False):
+    id: int
+    username: str
+    name: str
+    email: Optional[str]
+    created_at: Optional[str]
+    last_login: Optional[str]
+    is_active: bool
+    permissions: Optional[UserPermissionsDTO]
+
+# --- Payloads de entrada (msgspec) ---
+# Validação compilada do corpo JSON de POST/PUT /api/users: tipos, obrigatórios
+# e defaults são resolvidos numa única passada do decoder (sem cadeias de data.get).
+# forbid_unknown_fields: campo desconhecido (ex: erro de digitação) -> 400 citando o campo.
+NonEmptyStr = Annotated[str, msgspec.Meta(min_length=1)]
+
+class CreateUserPayload(msgspec.Struct, forbid_unknown_fields=True):
+    username: NonEmptyStr
+    password: NonEmptyStr
+    name: NonEmptyStr
+    email: Optional[str] = None
+    is_active: bool = True
+    is_admin: bool = False
+    can_access_products: bool = False
+    can_access_fabrics: bool = False
+    can_access_customer_panel: bool = False
+    can_access_fiscal: bool = False
+    can_access_accounts_receivable: bool = False
+
+class UpdateUserPayload(msgspec.Struct, forbid_unknown_fields=True):
+    # UNSET = campo não enviado; None em 'email' = limpar o email
+    name: Union[str, UnsetType] = UNSET
+    email: Union[Optional[str], UnsetType] = UNSET
+    is_active: Union[bool, UnsetType] = UNSET
+    password: Union[str, UnsetType] = UNSET
+    is_admin: Union[bool, UnsetType] = UNSET
+    can_access_products: Union[bool, UnsetType] = UNSET
+    can_access_fabrics: Union[bool, UnsetType] = UNSET
+    can_access_customer_panel: Union[bool, UnsetType] = UNSET
+    can_access_fiscal: Union[bool, UnsetType] = UNSET
+    can_access_accounts_receivable: Union[bool, UnsetType] = UNSET
+
+class BulkDeleteUsersPayload(msgspec.Struct, forbid_unknown_fields=True):
+    ids: Annotated[List[int], msgspec.Meta(min_length=1, max_length=1000)]
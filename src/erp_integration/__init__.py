@@ -1,6 +1,7 @@
 # src/erp_integration/__init__.py
 # Makes 'erp_integration' a package. Exports ERP service classes.
 
+from .http_session import erp_http_session
 from .erp_auth_service import ErpAuthService
 from .erp_balance_service import ErpBalanceService
 from .erp_cost_service import ErpCostService
@@ -19,6 +20,7 @@ erp_auth_service = ErpAuthService()
 __all__ = [
     "ErpAuthService",
     "erp_auth_service", # Export instance too
+    "erp_http_session", # Shared HTTP connection pool
     "ErpBalanceService",
     "ErpCostService",
     "ErpPersonService",
@@ -6,6 +6,7 @@ from typing import Optional, Dict, Any
 from src.config import config
 # Import domain models if needed for type hints, but methods return raw dicts
 from .erp_auth_service import ErpAuthService
+from .http_session import erp_http_session
 from src.utils.logger import logger
 from src.api.errors import ErpIntegrationError, ErpNotFoundError
 
@@ -14,18 +15,20 @@ class ErpAccountsReceivableService:
     Service to interact with the ERP's Accounts Receivable endpoints.
     """
 
-    def __init__(self, erp_auth_service: ErpAuthService):
+    def __init__(self, erp_auth_service: ErpAuthService, http: Optional[requests.Session] = None):
         """
         Initializes the ErpAccountsReceivableService.
 
         Args:
             erp_auth_service: Instance of ErpAuthService for authentication.
+            http: HTTP session to use (defaults to the shared ERP connection pool).
         """
         self.erp_auth_service = erp_auth_service
+        self.http = http or erp_http_session # Conexões keep-alive compartilhadas
         self.base_url = config.API_BASE_URL.rstrip('/')
-        self.documents_url = f"{self.base_url}{config.ACCOUNTS_RECEIVABLE_DOCUMENTS_ENDPOINT}"
-        self.bank_slip_url = f"{self.base_url}{config.ACCOUNTS_RECEIVABLE_BANKSLIP_ENDPOINT}"
-        # self.payment_link_url = f"{self.base_url}{config.ACCOUNTS_RECEIVABLE_PAYMENTLINK_ENDPOINT}" # If needed later
+        self.documents_url = f"{self.base_url}{config.ENDPOINTS['ACCOUNTS_RECEIVABLE_DOCUMENTS_ENDPOINT']}"
+        self.bank_slip_url = f"{self.base_url}{config.ENDPOINTS['ACCOUNTS_RECEIVABLE_BANKSLIP_ENDPOINT']}"
+        # self.payment_link_url = f"{self.base_url}{config.ENDPOINTS['ACCOUNTS_RECEIVABLE_PAYMENTLINK_ENDPOINT']}" # If needed later
         self.max_retries = config.MAX_RETRIES
         self.company_code = config.COMPANY_CODE
         logger.info("ErpAccountsReceivableService initialized.")
@@ -55,9 +58,9 @@ class ErpAccountsReceivableService:
                 timeout = 45 # Slightly longer timeout might be needed
 
                 if method.upper() == "POST":
-                    response = requests.post(url, json=json_payload, headers=headers, timeout=timeout)
+                    response = self.http.post(url, json=json_payload, headers=headers, timeout=timeout)
                 elif method.upper() == "GET":
-                    response = requests.get(url, params=params, headers=headers, timeout=timeout)
+                    response = self.http.get(url, params=params, headers=headers, timeout=timeout)
                 else:
                     raise ValueError(f"Unsupported HTTP method: {method}")
 
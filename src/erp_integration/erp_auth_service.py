@@ -6,6 +6,7 @@ import requests
 from typing import Optional, Dict, Any
 from threading import Lock
 from src.config import config # Import app configuration
+from .http_session import erp_http_session
 from src.utils.logger import logger
 from src.api.errors import ErpIntegrationError # Use custom error
 
@@ -38,7 +39,7 @@ class ErpAuthService:
             self._access_token: Optional[str] = None
             self._expires_at: float = 0 # Store expiration time as timestamp
             # Construct full URLs from config
-            self.auth_url = f"{config.API_BASE_URL.rstrip('/')}{config.TOKEN_ENDPOINT}"
+            self.auth_url = f"{config.API_BASE_URL.rstrip('/')}{config.ENDPOINTS['TOKEN_ENDPOINT']}"
             self.client_id = config.CLIENT_ID
             self.client_secret = config.CLIENT_SECRET
             self.username = config.API_USERNAME
@@ -110,7 +111,7 @@ class ErpAuthService:
 
         logger.debug(f"Requesting new ERP token from {self.auth_url}")
         try:
-            response = requests.post(
+            response = erp_http_session.post(
                 self.auth_url,
                 data=auth_data, # Use data for application/x-www-form-urlencoded
                 timeout=15 # Increased timeout for auth requests
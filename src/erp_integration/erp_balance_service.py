@@ -6,6 +6,7 @@ import requests
 from src.config import config
 from src.domain.balance import ProductResponse, ProductItem # Domain models
 from .erp_auth_service import ErpAuthService # ERP Auth service
+from .http_session import erp_http_session
 from src.utils.logger import logger
 from src.api.errors import ErpIntegrationError # Custom error
 
@@ -14,15 +15,17 @@ class ErpBalanceService:
     Service to interact with the ERP's product balance endpoint.
     """
 
-    def __init__(self, erp_auth_service: ErpAuthService):
+    def __init__(self, erp_auth_service: ErpAuthService, http: Optional[requests.Session] = None):
         """
         Initializes the ErpBalanceService.
 
         Args:
             erp_auth_service: Instance of ErpAuthService to get auth tokens.
+            http: HTTP session to use (defaults to the shared ERP connection pool).
         """
         self.erp_auth_service = erp_auth_service
-        self.api_url = f"{config.API_BASE_URL.rstrip('/')}{config.BALANCES_ENDPOINT}"
+        self.http = http or erp_http_session # Conexões keep-alive compartilhadas
+        self.api_url = f"{config.API_BASE_URL.rstrip('/')}{config.ENDPOINTS['BALANCES_ENDPOINT']}"
         self.max_retries = config.MAX_RETRIES
         self.page_size = config.PAGE_SIZE
         self.company_code = config.COMPANY_CODE
@@ -120,7 +123,7 @@ class ErpBalanceService:
                     # Add other headers if required by ERP
                 }
 
-                response = requests.post(
+                response = self.http.post(
                     self.api_url,
                     json=payload,
                     headers=headers,
@@ -7,6 +7,7 @@ from typing import Optional, List, Dict, Any
 from src.config import config
 from src.domain.fiscal import InvoiceXmlOutDto, DanfeRequestModel, DanfeResponseModel # Domain models
 from .erp_auth_service import ErpAuthService
+from .http_session import erp_http_session
 from src.utils.logger import logger
 from src.api.errors import ErpIntegrationError, ErpNotFoundError # Custom errors
 
@@ -19,20 +20,22 @@ class ErpFiscalService:
     Handles fetching invoices, XML content, and DANFE generation.
     """
 
-    def __init__(self, erp_auth_service: ErpAuthService):
+    def __init__(self, erp_auth_service: ErpAuthService, http: Optional[requests.Session] = None):
         """
         Initializes the ErpFiscalService.
 
         Args:
             erp_auth_service: Instance of ErpAuthService for authentication.
+            http: HTTP session to use (defaults to the shared ERP connection pool).
         """
         self.erp_auth_service = erp_auth_service
+        self.http = http or erp_http_session # Conexões keep-alive compartilhadas
         self.base_url = config.API_BASE_URL.rstrip('/')
         # Construct full URLs for endpoints
         # Use updated config keys
-        self.invoices_search_url = f"{self.base_url}{config.FISCAL_INVOICES_ENDPOINT}"
-        self.xml_content_url_template = f"{self.base_url}{config.FISCAL_XML_ENDPOINT}/{{accessKey}}"
-        self.danfe_search_url = f"{self.base_url}{config.FISCAL_DANFE_ENDPOINT}"
+        self.invoices_search_url = f"{self.base_url}{config.ENDPOINTS['FISCAL_INVOICES_ENDPOINT']}"
+        self.xml_content_url_template = f"{self.base_url}{config.ENDPOINTS['FISCAL_XML_ENDPOINT']}/{{accessKey}}"
+        self.danfe_search_url = f"{self.base_url}{config.ENDPOINTS['FISCAL_DANFE_ENDPOINT']}"
         self.max_retries = config.MAX_RETRIES
         self.company_code = config.COMPANY_CODE
         logger.info("ErpFiscalService initialized.")
@@ -82,9 +85,9 @@ class ErpFiscalService:
                 timeout = 60 if stream else 30 # Longer timeout for potential PDF generation
 
                 if method.upper() == "POST":
-                    response = requests.post(url, json=json_payload, headers=headers, timeout=timeout, stream=stream)
+                    response = self.http.post(url, json=json_payload, headers=headers, timeout=timeout, stream=stream)
                 elif method.upper() == "GET":
-                    response = requests.get(url, params=params, headers=headers, timeout=timeout, stream=stream)
+                    response = self.http.get(url, params=params, headers=headers, timeout=timeout, stream=stream)
                 else:
                     raise ValueError(f"Unsupported HTTP method: {method}")
 
@@ -6,6 +6,7 @@ from typing import Optional, List, Dict, Any, Union
 from src.config import config
 from src.domain.person import IndividualDataModel, LegalEntityDataModel, PersonStatisticsResponseModel
 from .erp_auth_service import ErpAuthService
+from .http_session import erp_http_session
 from src.utils.logger import logger
 from src.api.errors import ErpIntegrationError, ErpNotFoundError # Custom errors
 
@@ -15,19 +16,21 @@ class ErpPersonService:
     Handles fetching individuals, legal entities, and statistics.
     """
 
-    def __init__(self, erp_auth_service: ErpAuthService):
+    def __init__(self, erp_auth_service: ErpAuthService, http: Optional[requests.Session] = None):
         """
         Initializes the ErpPersonService.
 
         Args:
             erp_auth_service: Instance of ErpAuthService for authentication.
+            http: HTTP session to use (defaults to the shared ERP connection pool).
         """
         self.erp_auth_service = erp_auth_service
+        self.http = http or erp_http_session # Conexões keep-alive compartilhadas
         self.base_url = config.API_BASE_URL.rstrip('/')
         # Construct full URLs for endpoints
-        self.individuals_url = f"{self.base_url}{config.INDIVIDUALS_ENDPOINT}"
-        self.legal_entities_url = f"{self.base_url}{config.LEGAL_ENTITIES_ENDPOINT}"
-        self.stats_url = f"{self.base_url}{config.PERSON_STATS_ENDPOINT}"
+        self.individuals_url = f"{self.base_url}{config.ENDPOINTS['INDIVIDUALS_ENDPOINT']}"
+        self.legal_entities_url = f"{self.base_url}{config.ENDPOINTS['LEGAL_ENTITIES_ENDPOINT']}"
+        self.stats_url = f"{self.base_url}{config.ENDPOINTS['PERSON_STATS_ENDPOINT']}"
         self.max_retries = config.MAX_RETRIES
         self.company_code = config.COMPANY_CODE
         logger.info("ErpPersonService initialized.")
@@ -65,9 +68,9 @@ class ErpPersonService:
 
                 response: requests.Response
                 if method.upper() == "POST":
-                    response = requests.post(url, json=json_payload, headers=headers, timeout=20)
+                    response = self.http.post(url, json=json_payload, headers=headers, timeout=20)
                 elif method.upper() == "GET":
-                    response = requests.get(url, params=params, headers=headers, timeout=20)
+                    response = self.http.get(url, params=params, headers=headers, timeout=20)
                 else:
                     raise ValueError(f"Unsupported HTTP method: {method}")
 
@@ -0,0 +1,26 @@
+# src/erp_integration/http_session.py
+# Shared HTTP session (connection pool) for all ERP integration services.
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Tamanho do pool de conexões keep-alive por host do ERP
+ERP_HTTP_POOL_SIZE = 20
+
+
+def create_erp_http_session(pool_size: int = ERP_HTTP_POOL_SIZE) -> requests.Session:
+    """
+    Builds a requests.Session whose connections (TCP + TLS) are kept alive and
+    reused across calls. Retries stay in each service's own retry loop
+    (token refresh on 401, etc.), so the adapter itself never retries.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+# Sessão compartilhada por todos os serviços ERP (requests.Session é thread-safe
+# para requisições simples; headers/auth são passados por chamada, não na sessão).
+erp_http_session = create_erp_http_session()
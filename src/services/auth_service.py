@@ -166,6 +166,13 @@ class AuthService:
             logger.error(f"Unexpected error during token verification: {e}", exc_info=True)
             raise InvalidTokenError(f"Token verification failed due to an unexpected error: {e}")
 
+    def get_request_token(self) -> Optional[str]:
+        """Returns the raw token from the Authorization header (Bearer) or the Flask session."""
+        auth_header = request.headers.get('Authorization')
+        if auth_header and auth_header.startswith('Bearer '):
+            return auth_header.split(' ')[1]
+        return session.get('token')
+
     def get_current_user_from_request(self) -> Optional[User]:
         """
         Retrieves the currently authenticated user based on the token
@@ -174,12 +181,7 @@ class AuthService:
         Returns:
             The User object if authenticated and active, otherwise None.
         """
-        token = None
-        auth_header = request.headers.get('Authorization')
-        if auth_header and auth_header.startswith('Bearer '):
-            token = auth_header.split(' ')[1]
-        else:
-            token = session.get('token')
+        token = self.get_request_token()
 
         if not token:
             logger.debug("No authentication token found in request header or session.")
@@ -192,8 +194,8 @@ class AuthService:
                  logger.warning("Invalid token payload: Missing 'user_id'.")
                  return None
 
-            # Usar sessão para buscar o usuário no banco
-            with get_db_session() as db:
+            # Usar sessão para buscar o usuário no banco (somente leitura: sem COMMIT)
+            with get_db_session(readonly=True) as db:
                 # Fetch user from repository to ensure they still exist and are active
                 user = self.user_repository.find_by_id(db, user_id)
 
@@ -70,8 +70,8 @@ class ObservationService:
 
         logger.debug(f"Fetching observations for reference '{reference_code}' (include_resolved={include_resolved}).")
         try:
-            # Usar sessão para buscar
-            with get_db_session() as db:
+            # Usar sessão para buscar (somente leitura: sem COMMIT)
+            with get_db_session(readonly=True) as db:
                 observations = self.observation_repository.find_by_reference_code(db, reference_code, include_resolved)
             logger.debug(f"Found {len(observations)} observations for reference '{reference_code}'.")
             # Retornar a lista de objetos ORM diretamente (ou converter para dicts se a API precisar)
@@ -116,8 +116,8 @@ class ObservationService:
 
         logger.debug(f"Getting unresolved observation count for reference '{reference_code}'.")
         try:
-            # Usar sessão para contar
-            with get_db_session() as db:
+            # Usar sessão para contar (somente leitura: sem COMMIT)
+            with get_db_session(readonly=True) as db:
                 count = self.observation_repository.get_unresolved_count(db, reference_code)
             logger.debug(f"Unresolved count for reference '{reference_code}' is {count}.")
             return count
@@ -132,8 +132,8 @@ class ObservationService:
         """Retrieves references with pending observations using ORM."""
         logger.debug("Fetching references with pending observations.")
         try:
-            # Usar sessão para buscar
-            with get_db_session() as db:
+            # Usar sessão para buscar (somente leitura: sem COMMIT)
+            with get_db_session(readonly=True) as db:
                 references = self.observation_repository.get_references_with_pending(db)
             logger.debug(f"Found {len(references)} references with pending observations.")
             # O repositório já retorna dicts formatados
@@ -0,0 +1,61 @@
+# src/services/registry.py
+# Lazy registry of application/ERP services, built on first access.
+
+import threading
+from typing import Any, Callable, Dict, Optional
+
+from src.utils.logger import logger
+
+
+class LazyServiceRegistry:
+    """
+    Holds service factories and builds each service the first time it is requested.
+    Built instances are memoized, so every later lookup is a plain dict read.
+    Factories receive the registry itself and can resolve their dependencies from it
+    (e.g. lambda r: FabricService(r['erp_balance'], r['erp_cost'], r['erp_product'])).
+    """
+
+    def __init__(self):
+        self._factories: Dict[str, Callable[['LazyServiceRegistry'], Any]] = {}
+        self._instances: Dict[str, Any] = {}
+        self._lock = threading.RLock() # Reentrante: factories resolvem dependências dentro do lock
+
+    def register(self, name: str, factory: Callable[['LazyServiceRegistry'], Any]) -> None:
+        """Registers a factory for 'name'. The service is only built on first access."""
+        with self._lock:
+            self._factories[name] = factory
+            self._instances.pop(name, None)
+
+    def register_many(self, factories: Dict[str, Callable[['LazyServiceRegistry'], Any]]) -> None:
+        """Registers several factories at once ({name: factory})."""
+        with self._lock:
+            self._factories.update(factories)
+            for name in factories:
+                self._instances.pop(name, None)
+
+    def register_instance(self, name: str, instance: Any) -> None:
+        """Registers an already-built object (e.g. repositories created by create_app)."""
+        with self._lock:
+            self._instances[name] = instance
+
+    def __getitem__(self, name: str) -> Any:
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+        with self._lock:
+            instance = self._instances.get(name)
+            if instance is None:
+                factory = self._factories[name] # KeyError para nomes desconhecidos
+                logger.debug(f"Instantiating service '{name}' on first access.")
+                instance = factory(self)
+                self._instances[name] = instance
+            return instance
+
+    def get(self, name: str, default: Optional[Any] = None) -> Any:
+        """Like __getitem__, but returns 'default' for unregistered names."""
+        if name not in self:
+            return default
+        return self[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._instances or name in self._factories
@@ -0,0 +1,31 @@
+# src/utils/json_provider.py
+# Flask JSON provider backed by orjson (C-accelerated encoder/decoder).
+
+from typing import Any
+
+import orjson
+from flask.json.provider import DefaultJSONProvider
+
+# Opções base: chaves não-string (ex: int) são aceitas, datetimes UTC saem com 'Z'
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z
+
+
+class ORJSONProvider(DefaultJSONProvider):
+    """
+    JSON provider that serializes with orjson instead of the stdlib json module.
+    Used by jsonify() and request.get_json() app-wide once set as app.json.
+    Types orjson doesn't handle natively (Decimal, etc.) fall back to
+    DefaultJSONProvider.default.
+    """
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        option = _ORJSON_OPTIONS
+        # Flask passa indent/sort_keys quando a saída "bonita" está ativa (debug)
+        if kwargs.get('indent'):
+            option |= orjson.OPT_INDENT_2
+        if kwargs.get('sort_keys', self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, default=self.default, option=option).decode('utf-8')
+
+    def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+        return orjson.loads(s)
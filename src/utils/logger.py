@@ -42,6 +42,11 @@ class Logger:
         if self._initialized:
             return
 
+        self._logger = logging.getLogger(name)
+        # Handlers antes de ler a config: avisos emitidos durante load_config()
+        # (src/config/settings.py usa o mesmo logger) já saem no console/arquivo.
+        log_file_path = self._add_handlers()
+
         # Determine log level from argument, config, or default
         level_str = log_level
         if level_str is None:
@@ -59,9 +64,16 @@ class Logger:
             numeric_level = logging.DEBUG
             level_str = "DEBUG" # Update string representation
 
-        self._logger = logging.getLogger(name)
         self._logger.setLevel(numeric_level)
+        if log_file_path:
+            # Update print statement to reflect the handler used
+            print(f"Logging configured (ConcurrentRotatingFileHandler). Level: {level_str}. Log file: {log_file_path}")
 
+        self._initialized = True
+
+    def _add_handlers(self) -> Optional[str]:
+        """Attaches the console/file handlers once. Returns the log file path, if file logging is enabled."""
+        log_file_path = None
         # Prevent adding multiple handlers if re-initialized
         if not self._logger.handlers:
             formatter = logging.Formatter(LOG_FORMAT)
@@ -90,14 +102,12 @@ class Logger:
 
                 file_handler.setFormatter(formatter)
                 self._logger.addHandler(file_handler)
-                # Update print statement to reflect the handler used
-                print(f"Logging configured (ConcurrentRotatingFileHandler). Level: {level_str}. Log file: {log_file_path}")
 
             except Exception as e:
                  print(f"Error configuring concurrent file logging: {e}", file=sys.stderr)
+                 log_file_path = None
                  # Continue without file logging if it fails
-
-        self._initialized = True
+        return log_file_path
 
     def get_logger(self) -> logging.Logger:
         """Returns the configured logger instance."""
@@ -0,0 +1,51 @@
+# src/utils/process_lock.py
+# Non-blocking, process-wide file locks used to run background tasks in a single worker.
+
+import os
+import tempfile
+import threading
+from typing import Dict, IO
+
+from .logger import logger
+
+try:
+    import fcntl # Linux/macOS
+except ImportError: # pragma: no cover - Windows
+    fcntl = None
+    import msvcrt
+
+# Handles mantidos abertos durante toda a vida do processo: fechar o arquivo
+# libera o lock e deixaria outro worker assumir a tarefa.
+_held_locks: Dict[str, IO] = {}
+_held_locks_guard = threading.Lock()
+
+
+def try_acquire_process_lock(name: str) -> bool:
+    """
+    Tries to take an exclusive, non-blocking lock on '<tmpdir>/kdu_saldo_<name>.lock'.
+    Only one process on the host holds it at a time; it is released automatically
+    when the owning process exits (including crashes).
+
+    Returns:
+        True if this process holds the lock (now or already), False if another process does.
+    """
+    with _held_locks_guard:
+        if name in _held_locks:
+            return True
+
+        path = os.path.join(tempfile.gettempdir(), f"kdu_saldo_{name}.lock")
+        handle = open(path, 'a+')
+        try:
+            if fcntl is not None:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                handle.seek(0)
+                msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError: # BlockingIOError/PermissionError: outro processo é o dono
+            handle.close()
+            logger.debug(f"Process lock '{name}' is held by another process ({path}).")
+            return False
+
+        _held_locks[name] = handle
+        logger.debug(f"Process lock '{name}' acquired by PID {os.getpid()} ({path}).")
+        return True
@@ -11,26 +11,65 @@ from .logger import logger # Import the configured application logger
 _monitor_thread: Optional[threading.Thread] = None
 _stop_monitor = threading.Event()
 
+_process: Optional[psutil.Process] = None
+
+def _get_process() -> psutil.Process:
+    """Returns the cached psutil.Process for this PID (recreated after a fork)."""
+    global _process
+    if _process is None or _process.pid != os.getpid():
+        _process = psutil.Process(os.getpid())
+        _process.cpu_percent(interval=None) # Primeira chamada só inicializa a medição
+    return _process
+
+# Linux: RSS, tempo de CPU e threads vêm de uma única leitura de /proc/self/stat
+# (sem os objetos/dicts intermediários do psutil). Outros SOs usam o psutil.
+_PROC_STAT_PATH = '/proc/self/stat'
+_USE_PROC_STAT = os.path.exists(_PROC_STAT_PATH)
+if _USE_PROC_STAT:
+    _CLK_TCK = os.sysconf('SC_CLK_TCK')
+    _PAGE_SIZE = os.sysconf('SC_PAGE_SIZE')
+_last_cpu_sample: Optional[tuple] = None # (pid, monotonic, cpu_seconds)
+
+def _sample_process_stats() -> tuple:
+    """
+    Returns (rss_bytes, cpu_percent, num_threads) for the current process.
+    cpu_percent is the average since the previous sample (100% = one full core).
+    """
+    global _last_cpu_sample
+    if not _USE_PROC_STAT:
+        process = _get_process()
+        with process.oneshot():
+            return process.memory_info().rss, process.cpu_percent(interval=None), process.num_threads()
+
+    with open(_PROC_STAT_PATH, 'rb') as f:
+        raw = f.read()
+    # Campos após o nome do processo "(comm)"; índices relativos ao campo 3 (state)
+    fields = raw[raw.rindex(b')') + 2:].split()
+    cpu_seconds = (int(fields[11]) + int(fields[12])) / _CLK_TCK # utime + stime
+    num_threads = int(fields[17])
+    rss_bytes = int(fields[21]) * _PAGE_SIZE
+
+    now = time.monotonic()
+    pid = os.getpid()
+    cpu_percent = 0.0
+    if _last_cpu_sample and _last_cpu_sample[0] == pid and now > _last_cpu_sample[1]:
+        cpu_percent = (cpu_seconds - _last_cpu_sample[2]) / (now - _last_cpu_sample[1]) * 100
+    _last_cpu_sample = (pid, now, cpu_seconds)
+    return rss_bytes, cpu_percent, num_threads
+
 def log_system_resources():
     """Logs information about current system resource usage (Memory, CPU, Threads, etc.)."""
     try:
-        process = psutil.Process(os.getpid())
+        # Memory Usage (RSS), CPU Usage (média desde a amostra anterior, sem bloquear
+        # a thread) e Number of Threads
+        rss_bytes, cpu_percent, threads = _sample_process_stats()
 
-        # Memory Usage (RSS - Resident Set Size)
-        memory_info = process.memory_info()
-        mem_mb = memory_info.rss / (1024 * 1024)
+        mem_mb = rss_bytes / (1024 * 1024)
         logger.info(f"Resource Usage - Memory (RSS): {mem_mb:.2f} MB")
-
-        # CPU Usage
-        # cpu_percent() blocks for the specified interval. Use 0.1 for a quick check.
-        # Using interval=None gives usage since last call, which can be less intuitive for periodic checks.
-        cpu_percent = process.cpu_percent(interval=0.1)
         logger.info(f"Resource Usage - CPU: {cpu_percent:.2f}%")
-
-        # Number of Threads
-        threads = process.num_threads()
         logger.info(f"Resource Usage - Threads: {threads}")
 
+        process = _get_process()
         # File Descriptors (Platform dependent)
         try:
             open_files = len(process.open_files())
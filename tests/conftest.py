@@ -0,0 +1,7 @@
+# tests/conftest.py
+# Garante que o pacote 'src' seja importável ao rodar 'pytest' a partir da raiz.
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,37 @@
+# tests/test_db_session.py
+# Testes de get_db_session com a session factory real de init_sqlalchemy.
+
+import pytest
+
+import src.database as database
+from src.database import Base, dispose_sqlalchemy_engine, get_db_session, init_sqlalchemy
+from src.domain.observation import Observation
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = init_sqlalchemy(
+        f"sqlite:///{tmp_path / 'app.db'}", poolclass='QueuePool', pool_size=2, run_schema_init=False
+    )
+    Base.metadata.create_all(engine)
+    yield engine
+    dispose_sqlalchemy_engine()
+
+
+def test_factory_disables_autoflush_and_expire_on_commit(engine):
+    session = database._SessionLocalFactory()
+    try:
+        assert session.autoflush is False
+        assert session.expire_on_commit is False
+    finally:
+        session.close()
+
+
+def test_object_readable_after_committing_block(engine):
+    with get_db_session() as db:
+        observation = Observation(reference_code="REF1", observation_text="texto", user="admin")
+        db.add(observation)
+
+    # Commit + remove() já ocorreram: atributos seguem carregados (sem DetachedInstanceError)
+    assert observation.id is not None
+    assert observation.reference_code == "REF1"
@@ -0,0 +1,55 @@
+# tests/test_user_repository.py
+# Testes do UserRepository contra um SQLite em memória.
+
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from src.database.base import Base
+from src.database.user_repository import UserRepository
+from src.domain.user import User, UserPermissions
+
+
+@pytest.fixture
+def engine():
+    # Sem PRAGMA foreign_keys: o ON DELETE CASCADE não é aplicado pelo SQLite
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+def _new_user(username: str) -> User:
+    user = User(username=username, name=username.title(), password_hash="x")
+    user.permissions = UserPermissions()
+    return user
+
+
+def _count_permissions(db: Session) -> int:
+    return db.scalar(select(func.count()).select_from(UserPermissions))
+
+
+@pytest.mark.parametrize("delete_mode", ["delete_returning", "delete_many"])
+def test_delete_then_create_reuses_id_without_orphan_permissions(engine, delete_mode):
+    repo = UserRepository(engine)
+
+    with Session(engine) as db:
+        repo.add(db, _new_user("first"))
+        second_id = repo.add(db, _new_user("second")).id
+        db.commit()
+
+    with Session(engine) as db:
+        if delete_mode == "delete_returning":
+            assert repo.delete_returning(db, second_id) is True
+        else:
+            assert repo.delete_many(db, [second_id]) == {second_id}
+        db.commit()
+        assert _count_permissions(db) == 1
+
+    # O SQLite reutiliza o maior id + 1: o novo usuário recebe o id removido
+    with Session(engine) as db:
+        recreated = repo.add(db, _new_user("third"))
+        db.commit()
+        assert recreated.id == second_id
+        assert _count_permissions(db) == 2